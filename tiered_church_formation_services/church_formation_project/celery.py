@@ -2,6 +2,7 @@
 
 import os
 from celery import Celery
+from celery.utils.time import rate
 from django.conf import settings
 
 # Set the default Django settings module for the 'celery' program.
@@ -16,6 +17,9 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Auto-discover tasks in all installed apps
 app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
 
+# Record queue wait, run time and outcome metrics for every task
+from . import task_metrics  # noqa: E402,F401
+
 @app.task(bind=True)
 def debug_task(self):
     """
@@ -33,6 +37,10 @@ app.conf.beat_schedule = {
         'task': 'services.tasks.update_project_statuses',
         'schedule': 86400.0,  # Run daily
     },
+    'refresh-stale-recommendations': {
+        'task': 'resources.tasks.refresh_stale_recommendations',
+        'schedule': 3600.0,  # Run every hour
+    },
 }
 
 # Optional configuration, see the application user guide.
@@ -48,19 +56,63 @@ app.conf.update(
     enable_utc=True,
 )
 
+# Worker topology
+#
+# Each queue is consumed by its own worker pool so a burst on one (e.g. a
+# nightly email fan-out) never starves another (e.g. payments). The pools are
+# defined in docker-compose.yml, one worker instance each unless scaled out
+# with TASK_WORKER_INSTANCES; the concurrency below is what each instance runs
+# with and what `manage.py benchmark_task_queues` reproduces locally.
+#
+#   queue          tasks                                         concurrency  rate budget (per slot at 1 instance)
+#   payments       payment processing                            4            25/s (~6/s)
+#   notifications  email fan-out and reminder sweeps             8            30/m batches (~4/m)
+#   status         project status evaluation and sweeps          4            20/s (5/s)
+#   reports        monthly reports and payment cleanup           1            1/m (1/m)
+#   celery         everything else (default queue)               2            -
+WORKER_TOPOLOGY = {
+    queue: {'concurrency': concurrency, 'instances': settings.TASK_WORKER_INSTANCES.get(queue, 1)}
+    for queue, concurrency in [('payments', 4), ('notifications', 8), ('status', 4), ('reports', 1), ('celery', 2)]
+}
+
 # Define routing for specific tasks
 app.conf.task_routes = {
-    'services.tasks.process_payment': {'queue': 'payments'},
+    'services.tasks.process_payment_task': {'queue': 'payments'},
     'consultants.tasks.send_appointment_notification': {'queue': 'notifications'},
+    'consultants.tasks.send_appointment_reminders': {'queue': 'notifications'},
+    'services.tasks.send_email_batch': {'queue': 'notifications'},
+    'services.tasks.send_project_reminders': {'queue': 'notifications'},
+    'services.tasks.update_project_status_task': {'queue': 'status'},
+    'services.tasks.update_project_statuses': {'queue': 'status'},
+    'services.tasks.generate_monthly_report': {'queue': 'reports'},
+    'services.tasks.clean_pending_payments': {'queue': 'reports'},
 }
 
-# Configure task error handling
+def worker_rate_limit(task_name: str, budget: str) -> str:
+    """
+    Split a fleet-wide rate budget across the worker instances consuming the task's queue.
+
+    Celery enforces rate_limit per worker instance, with one token bucket
+    shared by all of the instance's pool processes, so the per-instance
+    limit is the budget divided by the number of instances.
+    """
+    queue = app.conf.task_routes.get(task_name, {}).get('queue', 'celery')
+    instances = WORKER_TOPOLOGY[queue]['instances']
+    if instances == 1:
+        return budget
+    return f"{rate(budget) / instances:g}/s"
+
+# Configure task throughput and error handling.
+# TASK_RATE_LIMITS in settings holds fleet-wide budgets; each worker instance gets its share.
 app.conf.task_annotations = {
     '*': {
-        'rate_limit': '10/m',
         'max_retries': 3,
         'default_retry_delay': 300,  # 5 minutes
-    }
+    },
+    **{
+        task_name: {'rate_limit': worker_rate_limit(task_name, budget)}
+        for task_name, budget in settings.TASK_RATE_LIMITS.items()
+    },
 }
 
 if __name__ == '__main__':
@@ -0,0 +1,23 @@
+## church_formation_project/metrics_views.py
+
+from django.http import HttpResponse
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from . import task_metrics
+from .middleware import recorder
+
+class TaskMetricsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(
+            task_metrics.render_prometheus(task_metrics.collect()),
+            content_type='text/plain; version=0.0.4'
+        )
+
+class RequestMetricsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(recorder.summary())
@@ -0,0 +1,106 @@
+## church_formation_project/middleware.py
+
+import math
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+class RequestMetricsRecorder:
+    """
+    Per-route ring buffers of (wall_ms, db_ms, query_count) samples for this process.
+    """
+
+    def __init__(self, buffer_size: int):
+        self.buffer_size = buffer_size
+        self._samples = defaultdict(lambda: deque(maxlen=self.buffer_size))
+        self._lock = threading.Lock()
+
+    def record(self, route: str, wall_ms: float, db_ms: float, query_count: int) -> None:
+        with self._lock:
+            self._samples[route].append((wall_ms, db_ms, query_count))
+
+    def summary(self) -> dict:
+        with self._lock:
+            snapshot = {route: list(samples) for route, samples in self._samples.items()}
+
+        summary = {}
+        for route, samples in sorted(snapshot.items()):
+            route_summary = {'samples': len(samples)}
+            for position, metric in enumerate(('wall_ms', 'db_ms', 'queries')):
+                values = sorted(sample[position] for sample in samples)
+                route_summary[metric] = {
+                    'p50': percentile(values, 0.50),
+                    'p95': percentile(values, 0.95),
+                    'p99': percentile(values, 0.99),
+                    'max': values[-1],
+                }
+            summary[route] = route_summary
+        return summary
+
+
+recorder = RequestMetricsRecorder(settings.REQUEST_METRICS_BUFFER_SIZE)
+
+
+class _QueryTimer:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+class RequestPerformanceMiddleware:
+    """
+    Measure wall time, SQL query count and SQL time for a sample of requests.
+
+    Sampled requests get a Server-Timing header and are recorded per resolved
+    URL name in the process-wide recorder. Unsampled requests pass straight
+    through, so REQUEST_METRICS_SAMPLE_RATE bounds the overhead.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.REQUEST_METRICS_SAMPLE_RATE
+
+    def __call__(self, request):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        timer = _QueryTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        wall_ms = (time.perf_counter() - started) * 1000
+        db_ms = timer.seconds * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        route = match.view_name if match else 'unresolved'
+        recorder.record(route, round(wall_ms, 2), round(db_ms, 2), timer.count)
+
+        response['Server-Timing'] = (
+            f'db;dur={db_ms:.2f};desc="{timer.count} queries", total;dur={wall_ms:.2f}'
+        )
+        return response
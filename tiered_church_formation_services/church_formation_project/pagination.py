@@ -0,0 +1,46 @@
+## church_formation_project/pagination.py
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination keyed on each list's own ordering.
+
+    The ordering comes from an explicit order_by() in the view, then the
+    model's Meta.ordering, then newest-first by primary key. Later pages
+    filter on the leading ordering column instead of using OFFSET, so with
+    an index on that column a deep page costs the same as the first one.
+    Rows tied on that column are still stepped through by offset, so the
+    primary key is appended to make the order within a tie stable.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(queryset.query.order_by or queryset.model._meta.ordering or ('-pk',))
+        if ordering[-1].lstrip('-') not in ('pk', queryset.model._meta.pk.name):
+            ordering += ('-pk' if ordering[0].startswith('-') else 'pk',)
+        return ordering
+
+    def _get_position_from_instance(self, instance, ordering):
+        field_name = ordering[0].lstrip('-')
+        if isinstance(instance, dict):
+            return str(instance[field_name])
+        for attr in field_name.split('__'):
+            instance = getattr(instance, attr)
+        return str(instance)
+
+
+class RankedPagination(PageNumberPagination):
+    """
+    Page-number pagination for relevance-ranked results.
+
+    A relevance score is a computed float with many ties, so it cannot act as
+    a keyset cursor: the cursor only encodes the leading column, and paging
+    on it repeats or skips rows. Ranked lists page by offset instead, over an
+    ordering that ends in the primary key so every page is disjoint.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
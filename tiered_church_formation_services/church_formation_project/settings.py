@@ -29,6 +29,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'users',
     'services',
@@ -37,6 +38,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'church_formation_project.middleware.RequestPerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -46,6 +48,10 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Request performance sampling (see church_formation_project/middleware.py)
+REQUEST_METRICS_SAMPLE_RATE = env.float('REQUEST_METRICS_SAMPLE_RATE', default=0.1)  # Fraction of requests measured
+REQUEST_METRICS_BUFFER_SIZE = env.int('REQUEST_METRICS_BUFFER_SIZE', default=1000)  # Samples kept per URL name
+
 ROOT_URLCONF = 'church_formation_project.urls'
 
 TEMPLATES = [
@@ -124,7 +130,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'church_formation_project.pagination.KeysetPagination',
+    'PAGE_SIZE': env.int('API_PAGE_SIZE', default=50),
 }
+API_MAX_PAGE_SIZE = env.int('API_MAX_PAGE_SIZE', default=200)  # Upper bound for ?page_size=
 
 # Celery settings
 CELERY_BROKER_URL = env('CELERY_BROKER_URL', default='redis://localhost:6379/0')
@@ -134,9 +143,49 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Task throughput policy: fleet-wide per-task rate budgets. Celery enforces rate
+# limits per worker instance, so celery.py divides each budget by the instances
+# serving the task's queue; see WORKER_TOPOLOGY there for the pool concurrency.
+TASK_RATE_LIMITS = {
+    'services.tasks.process_payment_task': env('PAYMENT_TASK_RATE_LIMIT', default='25/s'),  # Headroom under Stripe's API limit
+    'services.tasks.send_email_batch': env('EMAIL_BATCH_RATE_LIMIT', default='30/m'),  # Batches of EMAIL_BATCH_SIZE emails
+    'services.tasks.update_project_status_task': env('STATUS_TASK_RATE_LIMIT', default='20/s'),
+    'services.tasks.generate_monthly_report': env('REPORT_TASK_RATE_LIMIT', default='1/m'),
+}
+TASK_WORKER_INSTANCES = env.dict('TASK_WORKER_INSTANCES', cast={'value': int}, default={})  # e.g. payments=2;status=3 when pools are scaled out
+CELERY_BULK_TASK_BATCH_SIZE = env.int('CELERY_BULK_TASK_BATCH_SIZE', default=1000)  # Rows claimed per transaction by sweeps
+APPOINTMENT_REMINDER_LEAD_HOURS = env.int('APPOINTMENT_REMINDER_LEAD_HOURS', default=24)
+PROJECT_STATUS_DEBOUNCE_SECONDS = env.int('PROJECT_STATUS_DEBOUNCE_SECONDS', default=60)  # Window for coalescing status evaluations
+
+# Cache settings (shared across web and worker processes)
+CACHES = {
+    'default': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': env('REDIS_CACHE_URL', default='redis://localhost:6379/1'),
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+        },
+    }
+}
+
+# Entitlement settings
+PREMIUM_ACCESS_CACHE_TIMEOUT = env.int('PREMIUM_ACCESS_CACHE_TIMEOUT', default=300)  # 5 minutes
+
+# Search settings
+TRIGRAM_WORD_SIMILARITY_THRESHOLD = env.float('TRIGRAM_WORD_SIMILARITY_THRESHOLD', default=0.6)  # Must match pg_trgm.word_similarity_threshold
+SEARCH_SIMILARITY_THRESHOLD = env.float('SEARCH_SIMILARITY_THRESHOLD', default=0.6)  # Minimum trigram word similarity for fuzzy matches
+RESOURCE_FACETS_CACHE_TIMEOUT = env.int('RESOURCE_FACETS_CACHE_TIMEOUT', default=600)  # Also invalidated on every resource write
+CATEGORY_TREE_CACHE_TIMEOUT = env.int('CATEGORY_TREE_CACHE_TIMEOUT', default=3600)  # Also invalidated on every category write
+
+# Recommendation settings
+RECOMMENDATION_COUNT = env.int('RECOMMENDATION_COUNT', default=20)  # Stored per user; premium ones are filtered when served
+RECOMMENDATION_REFRESH_DEBOUNCE_SECONDS = env.int('RECOMMENDATION_REFRESH_DEBOUNCE_SECONDS', default=300)
+RECOMMENDATION_MAX_AGE_HOURS = env.int('RECOMMENDATION_MAX_AGE_HOURS', default=24)
+
 # Stripe settings
 STRIPE_PUBLIC_KEY = env('STRIPE_PUBLIC_KEY', default='your-stripe-public-key')
 STRIPE_SECRET_KEY = env('STRIPE_SECRET_KEY', default='your-stripe-secret-key')
+PAYMENT_CLEANUP_BATCH_SIZE = env.int('PAYMENT_CLEANUP_BATCH_SIZE', default=1000)  # Stale payments removed per transaction
 
 # Email settings
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -145,6 +194,7 @@ EMAIL_PORT = env.int('EMAIL_PORT', default=587)
 EMAIL_USE_TLS = env.bool('EMAIL_USE_TLS', default=True)
 EMAIL_HOST_USER = env('EMAIL_HOST_USER', default='your-email@example.com')
 EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD', default='your-email-password')
+EMAIL_BATCH_SIZE = env.int('EMAIL_BATCH_SIZE', default=200)  # Emails sent per connection by bulk tasks
 
 # Logging configuration
 LOGGING = {
@@ -0,0 +1,138 @@
+## church_formation_project/task_metrics.py
+
+import time
+import logging
+from celery.signals import before_task_publish, task_prerun, task_postrun, task_failure, task_retry
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds, Prometheus style.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, float('inf'))
+
+TASKS_KEY = 'task_metrics:tasks'
+HISTOGRAM_KEY = 'task_metrics:{task}:{metric}'
+OUTCOMES_KEY = 'task_metrics:{task}:outcomes'
+
+# Start times of tasks running in this worker process, keyed by task id.
+_started_at = {}
+
+
+def _bucket_label(seconds: float) -> str:
+    for bound in BUCKETS:
+        if seconds <= bound:
+            return '+Inf' if bound == float('inf') else str(bound)
+    return '+Inf'
+
+
+def _observe(pipe, task_name: str, metric: str, seconds: float) -> None:
+    key = HISTOGRAM_KEY.format(task=task_name, metric=metric)
+    pipe.hincrby(key, _bucket_label(seconds), 1)
+    pipe.hincrby(key, 'count', 1)
+    pipe.hincrbyfloat(key, 'sum', seconds)
+
+
+def _record(task_name: str, observations=(), outcome: str = None) -> None:
+    """
+    Write observations and an outcome for a task in one Redis round trip.
+
+    Metrics live in Redis rather than in-process so every worker in the fleet
+    contributes to the same histograms. Failures to record are logged and
+    never affect the task itself.
+    """
+    try:
+        pipe = get_redis_connection('default').pipeline(transaction=False)
+        pipe.sadd(TASKS_KEY, task_name)
+        for metric, seconds in observations:
+            _observe(pipe, task_name, metric, seconds)
+        if outcome:
+            pipe.hincrby(OUTCOMES_KEY.format(task=task_name), outcome, 1)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not record task metrics for {task_name}: {str(e)}")
+
+
+@before_task_publish.connect
+def stamp_enqueue_time(headers=None, **kwargs):
+    if headers is not None:
+        headers['enqueued_at'] = time.time()
+
+
+@task_prerun.connect
+def record_task_start(task_id=None, task=None, **kwargs):
+    now = time.time()
+    _started_at[task_id] = now
+    enqueued_at = getattr(task.request, 'enqueued_at', None)
+    if enqueued_at:
+        _record(task.name, observations=[('queue_wait_seconds', max(now - enqueued_at, 0))])
+
+
+@task_postrun.connect
+def record_task_finish(task_id=None, task=None, state=None, **kwargs):
+    started_at = _started_at.pop(task_id, None)
+    observations = []
+    if started_at is not None:
+        observations.append(('run_seconds', time.time() - started_at))
+    # Failures and retries are counted by their own signals.
+    _record(task.name, observations=observations, outcome='success' if state == 'SUCCESS' else None)
+
+
+@task_failure.connect
+def record_task_failure(sender=None, **kwargs):
+    _record(sender.name, outcome='failure')
+
+
+@task_retry.connect
+def record_task_retry(sender=None, **kwargs):
+    _record(sender.name, outcome='retry')
+
+
+def collect() -> dict:
+    """
+    Return {task_name: {'queue_wait_seconds': {...}, 'run_seconds': {...}, 'outcomes': {...}}}.
+    """
+    conn = get_redis_connection('default')
+    task_names = sorted(name.decode() for name in conn.smembers(TASKS_KEY))
+    pipe = conn.pipeline(transaction=False)
+    for task_name in task_names:
+        pipe.hgetall(HISTOGRAM_KEY.format(task=task_name, metric='queue_wait_seconds'))
+        pipe.hgetall(HISTOGRAM_KEY.format(task=task_name, metric='run_seconds'))
+        pipe.hgetall(OUTCOMES_KEY.format(task=task_name))
+    raw = pipe.execute()
+
+    stats = {}
+    for index, task_name in enumerate(task_names):
+        queue_wait, run, outcomes = raw[index * 3:index * 3 + 3]
+        stats[task_name] = {
+            'queue_wait_seconds': {k.decode(): float(v) for k, v in queue_wait.items()},
+            'run_seconds': {k.decode(): float(v) for k, v in run.items()},
+            'outcomes': {k.decode(): int(v) for k, v in outcomes.items()},
+        }
+    return stats
+
+
+def render_prometheus(stats: dict) -> str:
+    """
+    Render collected metrics in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in ('queue_wait_seconds', 'run_seconds'):
+        name = f'celery_task_{metric}'
+        lines.append(f'# TYPE {name} histogram')
+        for task_name, task_stats in stats.items():
+            histogram = task_stats[metric]
+            if not histogram:
+                continue
+            cumulative = 0
+            for bound in BUCKETS:
+                label = '+Inf' if bound == float('inf') else str(bound)
+                cumulative += histogram.get(label, 0)
+                lines.append(f'{name}_bucket{{task="{task_name}",le="{label}"}} {int(cumulative)}')
+            lines.append(f'{name}_sum{{task="{task_name}"}} {histogram.get("sum", 0)}')
+            lines.append(f'{name}_count{{task="{task_name}"}} {int(histogram.get("count", 0))}')
+
+    lines.append('# TYPE celery_task_outcomes_total counter')
+    for task_name, task_stats in stats.items():
+        for outcome, count in sorted(task_stats['outcomes'].items()):
+            lines.append(f'celery_task_outcomes_total{{task="{task_name}",outcome="{outcome}"}} {count}')
+    return '\n'.join(lines) + '\n'
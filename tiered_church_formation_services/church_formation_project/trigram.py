@@ -0,0 +1,57 @@
+## church_formation_project/trigram.py
+
+from django.conf import settings
+from django.db.models import CharField, FloatField, Func, QuerySet, TextField, Value
+from django.db.models.functions import Greatest
+from django.db.models.lookups import PostgresOperatorLookup
+
+
+@CharField.register_lookup
+@TextField.register_lookup
+class TrigramWordSimilar(PostgresOperatorLookup):
+    """
+    ``field %> query``: some extent of the field is word-similar to the query.
+
+    The operator is served by gin_trgm_ops indexes and matches against
+    pg_trgm.word_similarity_threshold, mirrored in TRIGRAM_WORD_SIMILARITY_THRESHOLD.
+    """
+    lookup_name = 'trigram_word_similar'
+    postgres_operator = '%%>'
+
+
+class TrigramWordSimilarity(Func):
+    function = 'WORD_SIMILARITY'
+    output_field = FloatField()
+
+    def __init__(self, string, expression, **extra):
+        if not hasattr(string, 'resolve_expression'):
+            string = Value(string)
+        super().__init__(string, expression, **extra)
+
+
+def fuzzy_search(queryset: QuerySet, text: str, fields: list, threshold: float = None) -> QuerySet:
+    """
+    Typo-tolerant match of ``text`` against ``fields``, best match first.
+
+    Candidates are found with one ``%>`` query per field and the id sets are
+    UNIONed, so every field, including ones on joined tables, is searched
+    through its own trigram index; OR-ing the operators in one WHERE clause
+    leaves the planner no index path across tables. Candidates are then
+    scored by their best word similarity and cut at ``threshold``, which
+    cannot go below TRIGRAM_WORD_SIMILARITY_THRESHOLD because the index
+    operator has already applied the database's own threshold. Ties are
+    broken by primary key so the order is total.
+    """
+    threshold = settings.SEARCH_SIMILARITY_THRESHOLD if threshold is None else threshold
+    if threshold < settings.TRIGRAM_WORD_SIMILARITY_THRESHOLD:
+        raise ValueError(
+            f"threshold {threshold} is below the database trigram threshold "
+            f"{settings.TRIGRAM_WORD_SIMILARITY_THRESHOLD} and would have no effect."
+        )
+    manager = queryset.model._base_manager
+    candidates = [manager.order_by().filter(**{f'{field}__trigram_word_similar': text}).values('pk') for field in fields]
+    matches = candidates[0].union(*candidates[1:]) if len(candidates) > 1 else candidates[0]
+    scores = [TrigramWordSimilarity(text, field) for field in fields]
+    similarity = Greatest(*scores) if len(scores) > 1 else scores[0]
+    return queryset.filter(pk__in=matches).annotate(similarity=similarity)\
+        .filter(similarity__gte=threshold).order_by('-similarity', 'pk')
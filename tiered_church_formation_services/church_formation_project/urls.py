@@ -5,6 +5,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from .metrics_views import RequestMetricsView, TaskMetricsView
 
 urlpatterns = [
     # Admin
@@ -27,6 +28,10 @@ urlpatterns = [
         # JWT authentication
         path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
         path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+
+        # Operational metrics (admin only)
+        path('metrics/tasks/', TaskMetricsView.as_view(), name='task_metrics'),
+        path('metrics/requests/', RequestMetricsView.as_view(), name='request_metrics'),
     ])),
 ]
 
@@ -0,0 +1,188 @@
+## conftest.py
+
+import io
+import re
+import uuid
+from collections import Counter
+from datetime import time
+from urllib.parse import parse_qsl, urlsplit
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.models.signals import pre_migrate
+from django.dispatch import receiver
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from church_formation_project.celery import app as celery_app
+from consultants.models import Appointment, Consultant, ConsultantAvailability, ConsultantRating
+from resources.models import Resource, ResourceAccess, ResourceCategory, ResourceCategoryAssignment, ResourceRating
+from services.models import ClientProject, Payment, ServiceTier
+
+# Run tasks inline instead of sending them to the broker
+celery_app.conf.task_always_eager = True
+
+# Page sizes every list endpoint is rendered at by assert_constant_queries
+LIST_PAGE_SIZES = (1, 5, 25)
+
+
+@receiver(pre_migrate)
+def create_postgres_extensions(using, **kwargs):
+    # The trigram indexes on the unmigrated apps need pg_trgm before their tables are created
+    with connections[using].cursor() as cursor:
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def api_factory():
+    return APIRequestFactory(SERVER_NAME='localhost')
+
+
+@pytest.fixture
+def make_user(db):
+    created = []
+
+    def make_user(**extra_fields):
+        email = extra_fields.pop('email', f'user{len(created)}@example.com')
+        user = get_user_model().objects.create_user(email=email, password='password', **extra_fields)
+        created.append(user)
+        return user
+
+    return make_user
+
+
+@pytest.fixture
+def walk_pages(api_factory):
+    def walk_pages(view, user, params, max_pages=50):
+        """
+        Follow a list endpoint's next links from the first page and return every result id in order.
+        """
+        ids, query, pages = [], dict(params), 0
+        while query is not None:
+            request = api_factory.get('/', query)
+            force_authenticate(request, user=user)
+            response = view.as_view()(request)
+            assert response.status_code == 200, response.data
+            ids.extend(result['id'] for result in response.data['results'])
+            pages += 1
+            assert pages <= max_pages, 'pagination does not terminate'
+            next_url = response.data['next']
+            query = dict(parse_qsl(urlsplit(next_url).query)) if next_url else None
+        return ids
+
+    return walk_pages
+
+
+@pytest.fixture
+def list_data(db):
+    """
+    Enough rows of every listed collection, owned by one client and one consultant, to fill the largest page.
+    """
+    User = get_user_model()
+    rows = max(LIST_PAGE_SIZES) + 5
+    now = timezone.now()
+    client = User.objects.create_user(email='list-client@example.com', first_name='List', last_name='Client')
+    consultant_user = User.objects.create_user(email='list-consultant@example.com', first_name='List', last_name='Consultant')
+    consultant = Consultant.objects.create(
+        user=consultant_user, specialization='Church formation', bio='Helps churches incorporate.', hourly_rate=100,
+    )
+    ConsultantAvailability.objects.bulk_create(
+        ConsultantAvailability(consultant=consultant, day_of_week=day, start_time=time(0, 0), end_time=time(23, 59))
+        for day in range(7)
+    )
+    tier = ServiceTier.objects.create(name='Standard', description='Standard tier.', price=1499)
+
+    ServiceTier.objects.bulk_create(ServiceTier(name=f'Tier {i}', description='Tier.', price=50 + i) for i in range(rows))
+    projects = ClientProject.objects.bulk_create(
+        ClientProject(client=client, service_tier=tier, project_name=f'Church plant {i}', progress={'intake': 'completed'})
+        for i in range(rows)
+    )
+    Payment.objects.bulk_create(
+        Payment(user=client, amount=100, stripe_charge_id=f'list_{i}', status='completed') for i in range(rows)
+    )
+
+    raters = User.objects.bulk_create(
+        User(email=f'list-rater-{i}@example.com', first_name='Rater', last_name=str(i)) for i in range(rows)
+    )
+    ConsultantRating.objects.bulk_create(ConsultantRating(consultant=consultant, client=rater, rating=5) for rater in raters)
+    others = Consultant.objects.bulk_create(
+        Consultant(user=rater, specialization='Formation law', bio='Helps.', hourly_rate=80 + i) for i, rater in enumerate(raters)
+    )
+    ConsultantRating.objects.bulk_create(ConsultantRating(consultant=other, client=client, rating=4) for other in others)
+    Appointment.objects.bulk_create(
+        Appointment(
+            consultant=consultant,
+            project=project,
+            start_time=now + timezone.timedelta(days=1, hours=2 * i),
+            end_time=now + timezone.timedelta(days=1, hours=2 * i + 1),
+        )
+        for i, project in enumerate(projects)
+    )
+
+    categories = ResourceCategory.objects.bulk_create(ResourceCategory(name=f'Category {i}') for i in range(rows))
+    ResourceCategory.objects.bulk_create(
+        ResourceCategory(name=f'Subcategory {i}', parent=category) for i, category in enumerate(categories)
+    )
+    resources = Resource.objects.bulk_create(
+        Resource(
+            title=f'Formation guide {i}',
+            description='Formation guide',
+            file_type='pdf',
+            file_url=f'resources/guide-{i}.pdf',
+            tags=['guide', f'tag{i % 3}'],
+            created_by=client,
+        )
+        for i in range(rows)
+    )
+    ResourceCategoryAssignment.objects.bulk_create(
+        ResourceCategoryAssignment(resource=resource, category=category) for resource, category in zip(resources, categories)
+    )
+    ResourceAccess.objects.bulk_create(ResourceAccess(user=client, resource=resource) for resource in resources)
+    ResourceRating.objects.bulk_create(ResourceRating(user=client, resource=resource, rating=4) for resource in resources)
+
+    call_command('rebuild_category_paths', stdout=io.StringIO())
+    call_command('rebuild_rating_counters', stdout=io.StringIO())
+    call_command('rebuild_search_vectors', stdout=io.StringIO())
+    return {'client': client, 'consultant': consultant, 'consultant_user': consultant_user}
+
+
+@pytest.fixture
+def assert_constant_queries(api_factory, list_data):
+    def assert_constant_queries(view, user_key, url_kwargs, params):
+        """
+        Render ``view`` at every LIST_PAGE_SIZES and fail, naming the repeated statements, if
+        a larger page runs more queries than the smallest one.
+        """
+        kwargs = {key: list_data[value].pk for key, value in url_kwargs.items()}
+
+        def capture(page_size):
+            # A unique query string keeps cache_page from answering the request
+            request = api_factory.get('/', dict(params, page_size=page_size, _=uuid.uuid4().hex))
+            force_authenticate(request, user=list_data[user_key])
+            with CaptureQueriesContext(connection) as context:
+                response = view.as_view()(request, **kwargs)
+                response.render()
+            assert response.status_code == 200, response.data
+            return Counter(re.sub(r"'[^']*'|\b\d+\b", '?', query['sql']) for query in context.captured_queries)
+
+        capture(LIST_PAGE_SIZES[0])  # Warm per-user caches so every measurement sees the same state
+        baseline = capture(LIST_PAGE_SIZES[0])
+        for page_size in LIST_PAGE_SIZES[1:]:
+            counts = capture(page_size)
+            grown = {sql: count for sql, count in counts.items() if count > baseline[sql]}
+            assert sum(counts.values()) <= sum(baseline.values()), (
+                f'{view.__name__} runs {sum(baseline.values())} queries at page_size={LIST_PAGE_SIZES[0]} '
+                f'and {sum(counts.values())} at page_size={page_size}; repeated per row:\n'
+                + '\n'.join(f'  {baseline[sql]} -> {count}: {sql}' for sql, count in grown.items())
+            )
+
+    return assert_constant_queries
@@ -1,7 +1,10 @@
 ## consultants/models.py
 
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.conf import settings
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 
@@ -13,12 +16,34 @@ class Consultant(models.Model):
     is_available = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.specialization}"
 
+    @property
+    def average_rating(self):
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+    def record_rating(self, rating: int, previous_rating: int = None):
+        """
+        Fold a new or changed rating into the stored counters with a single UPDATE.
+        """
+        updates = {'rating_sum': models.F('rating_sum') + (rating - (previous_rating or 0))}
+        if previous_rating is None:
+            updates['rating_count'] = models.F('rating_count') + 1
+        Consultant.objects.filter(pk=self.pk).update(**updates)
+
     class Meta:
         ordering = ['user__last_name', 'user__first_name']
+        indexes = [
+            models.Index(fields=['is_available', 'hourly_rate']),
+            GinIndex(fields=['specialization'], name='consultant_specialization_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['bio'], name='consultant_bio_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
 class Appointment(models.Model):
     STATUS_CHOICES = [
@@ -34,6 +59,7 @@ class Appointment(models.Model):
     end_time = models.DateTimeField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='scheduled')
     notes = models.TextField(blank=True)
+    reminder_sent_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -72,6 +98,11 @@ class Appointment(models.Model):
             models.Index(fields=['consultant', 'start_time']),
             models.Index(fields=['project', 'start_time']),
             models.Index(fields=['status']),
+            models.Index(
+                fields=['start_time'],
+                name='appointment_reminder_due_idx',
+                condition=models.Q(status='scheduled', reminder_sent_at__isnull=True),
+            ),
         ]
 
 class ConsultantRating(models.Model):
@@ -87,6 +118,9 @@ class ConsultantRating(models.Model):
     class Meta:
         unique_together = ['consultant', 'client']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['consultant', '-created_at']),
+        ]
 
 class ConsultantAvailability(models.Model):
     consultant = models.ForeignKey(Consultant, on_delete=models.CASCADE, related_name='availabilities')
@@ -109,3 +143,11 @@ class ConsultantAvailability(models.Model):
     def save(self, *args, **kwargs):
         self.clean()
         super().save(*args, **kwargs)
+
+@receiver(post_delete, sender=ConsultantRating)
+def forget_deleted_consultant_rating(sender, instance, **kwargs):
+    # Admin deletes and cascades from a deleted user never pass through the rating views
+    Consultant.objects.filter(pk=instance.consultant_id).update(
+        rating_sum=models.F('rating_sum') - instance.rating,
+        rating_count=models.F('rating_count') - 1,
+    )
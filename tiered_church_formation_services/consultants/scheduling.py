@@ -0,0 +1,141 @@
+## consultants/scheduling.py
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from django.db.models import Exists, OuterRef, QuerySet
+from django.utils import timezone
+from .models import Appointment, ConsultantAvailability
+
+# Slots offered from "now" start on the next quarter hour rather than at odd minutes.
+SLOT_ALIGNMENT = timedelta(minutes=15)
+
+
+def load_weekly_windows(consultant_id: int) -> dict:
+    """
+    Return the consultant's availability as {day_of_week: [(start_time, end_time), ...]}.
+    """
+    windows = defaultdict(list)
+    availabilities = ConsultantAvailability.objects.filter(consultant_id=consultant_id).values_list(
+        'day_of_week', 'start_time', 'end_time'
+    )
+    for day_of_week, start_time, end_time in availabilities:
+        windows[day_of_week].append((start_time, end_time))
+    for day_windows in windows.values():
+        day_windows.sort()
+    return windows
+
+
+def load_busy_intervals(consultant_id: int, range_start: datetime, range_end: datetime) -> list:
+    """
+    Return the consultant's booked (start_time, end_time) pairs overlapping the range, oldest first.
+    """
+    return list(
+        Appointment.objects.filter(
+            consultant_id=consultant_id,
+            start_time__lt=range_end,
+            end_time__gt=range_start,
+        ).exclude(status='cancelled').order_by('start_time').values_list('start_time', 'end_time')
+    )
+
+
+def has_conflicting_appointment(consultant_id: int, start_time: datetime, end_time: datetime, exclude_pk: int = None) -> bool:
+    """
+    Return whether an active appointment of the consultant overlaps the window.
+
+    Only authoritative when the caller holds the consultant row lock
+    (``Consultant.objects.select_for_update()``) inside the booking transaction.
+    """
+    overlapping = Appointment.objects.filter(
+        consultant_id=consultant_id,
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    ).exclude(status='cancelled')
+    if exclude_pk is not None:
+        overlapping = overlapping.exclude(pk=exclude_pk)
+    return overlapping.exists()
+
+
+def free_slots(windows: dict, busy: list, range_start: datetime, range_end: datetime, duration: timedelta) -> list:
+    """
+    Cut the weekly windows into back-to-back slots of ``duration`` that avoid every busy interval.
+
+    ``busy`` must be sorted by start time. Days, windows and busy intervals are
+    each walked once, so the cost is linear in the size of the range plus the
+    number of appointments.
+    """
+    tz = timezone.get_current_timezone()
+    slots = []
+    busy_index = 0
+    day = timezone.localtime(range_start, tz).date()
+    last_day = timezone.localtime(range_end, tz).date()
+
+    while day <= last_day:
+        for window_start, window_end in windows.get(day.weekday(), ()):
+            start = max(timezone.make_aware(datetime.combine(day, window_start), tz), range_start)
+            end = min(timezone.make_aware(datetime.combine(day, window_end), tz), range_end)
+
+            # Appointments that finished before this window can never matter again.
+            while busy_index < len(busy) and busy[busy_index][1] <= start:
+                busy_index += 1
+
+            cursor = start
+            index = busy_index
+            while cursor + duration <= end:
+                if index < len(busy) and busy[index][0] < cursor + duration:
+                    cursor = max(cursor, busy[index][1])
+                    index += 1
+                    continue
+                slots.append((cursor, cursor + duration))
+                cursor += duration
+        day += timedelta(days=1)
+
+    return slots
+
+
+def next_slot_boundary(moment: datetime) -> datetime:
+    """
+    Round ``moment`` up to the next SLOT_ALIGNMENT boundary.
+    """
+    floor = moment.replace(second=0, microsecond=0)
+    remainder = (floor.minute * 60) % int(SLOT_ALIGNMENT.total_seconds())
+    if remainder == 0 and floor == moment:
+        return floor
+    return floor + SLOT_ALIGNMENT - timedelta(seconds=remainder)
+
+
+def find_consultant_slots(consultant_id: int, range_start: datetime, range_end: datetime, duration: timedelta) -> list:
+    """
+    Return every bookable (start_time, end_time) slot for a consultant using two queries.
+    """
+    range_start = max(range_start, next_slot_boundary(timezone.now()))
+    if range_start >= range_end:
+        return []
+    windows = load_weekly_windows(consultant_id)
+    if not windows:
+        return []
+    busy = load_busy_intervals(consultant_id, range_start, range_end)
+    return free_slots(windows, busy, range_start, range_end, duration)
+
+
+def filter_free_consultants(queryset: QuerySet, start_time: datetime, end_time: datetime) -> QuerySet:
+    """
+    Narrow a Consultant queryset to those whose weekly availability covers the
+    window and who have no appointment overlapping it.
+
+    Both conditions are expressed as joins/subqueries so the database answers
+    for every consultant in one statement instead of a query per consultant.
+    """
+    local_start = timezone.localtime(start_time)
+    local_end = timezone.localtime(end_time)
+    overlapping = Appointment.objects.filter(
+        consultant=OuterRef('pk'),
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    ).exclude(status='cancelled')
+    covering = ConsultantAvailability.objects.filter(
+        consultant=OuterRef('pk'),
+        day_of_week=local_start.weekday(),
+        start_time__lte=local_start.time(),
+        end_time__gte=local_end.time(),
+    )
+    return queryset.filter(is_available=True).filter(Exists(covering)).exclude(Exists(overlapping))
@@ -1,6 +1,8 @@
 ## consultants/serializers.py
 
+from django.conf import settings
 from rest_framework import serializers
+from django.utils import timezone
 from .models import Consultant, Appointment, ConsultantRating, ConsultantAvailability
 from users.serializers import UserSerializer
 from services.serializers import ClientProjectSerializer
@@ -11,13 +13,8 @@ class ConsultantSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Consultant
-        fields = ['id', 'user', 'specialization', 'bio', 'hourly_rate', 'is_available', 'created_at', 'updated_at', 'average_rating']
-        read_only_fields = ['id', 'created_at', 'updated_at']
-
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation['average_rating'] = instance.ratings.aggregate(avg_rating=models.Avg('rating'))['avg_rating'] or 0
-        return representation
+        fields = ['id', 'user', 'specialization', 'bio', 'hourly_rate', 'is_available', 'created_at', 'updated_at', 'average_rating', 'rating_count']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'rating_count']
 
 class AppointmentSerializer(serializers.ModelSerializer):
     consultant = ConsultantSerializer(read_only=True)
@@ -33,6 +30,16 @@ class AppointmentSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("End time must be after start time.")
         return data
 
+class AppointmentSummarySerializer(serializers.ModelSerializer):
+    consultant_name = serializers.CharField(source='consultant.user.get_full_name', read_only=True)
+    client_name = serializers.CharField(source='project.client.get_full_name', read_only=True)
+    project_name = serializers.CharField(source='project.project_name', read_only=True)
+
+    class Meta:
+        model = Appointment
+        fields = ['id', 'consultant_id', 'consultant_name', 'project_id', 'project_name', 'client_name', 'start_time', 'end_time', 'status']
+        read_only_fields = fields
+
 class ConsultantRatingSerializer(serializers.ModelSerializer):
     client = UserSerializer(read_only=True)
 
@@ -78,7 +85,7 @@ class AppointmentCreateSerializer(serializers.ModelSerializer):
             consultant=data['consultant'],
             start_time__lt=data['end_time'],
             end_time__gt=data['start_time']
-        )
+        ).exclude(status='cancelled')
         if overlapping_appointments.exists():
             raise serializers.ValidationError("This time slot is already booked.")
         
@@ -88,12 +95,45 @@ class ConsultantSearchSerializer(serializers.Serializer):
     specialization = serializers.CharField(required=False, allow_blank=True)
     min_rating = serializers.FloatField(required=False, min_value=0, max_value=5)
     max_hourly_rate = serializers.DecimalField(required=False, max_digits=6, decimal_places=2, min_value=0)
+    start_time = serializers.DateTimeField(required=False)
+    end_time = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if ('start_time' in data) != ('end_time' in data):
+            raise serializers.ValidationError("Both start_time and end_time are required to search by availability.")
+        if 'start_time' in data:
+            if data['start_time'] >= data['end_time']:
+                raise serializers.ValidationError("End time must be after start time.")
+            if timezone.localtime(data['start_time']).date() != timezone.localtime(data['end_time']).date():
+                raise serializers.ValidationError("The availability window must fall within a single day.")
+        return data
+
+class ConsultantSlotSearchSerializer(serializers.Serializer):
+    start_date = serializers.DateField(required=True)
+    end_date = serializers.DateField(required=True)
+    duration = serializers.IntegerField(required=False, default=60, min_value=15, max_value=480)
+
+    def validate(self, data):
+        if data['start_date'] > data['end_date']:
+            raise serializers.ValidationError("End date must not be before start date.")
+        if (data['end_date'] - data['start_date']).days > 366:
+            raise serializers.ValidationError("Slot searches are limited to one year.")
+        return data
+
+class ConsultantSlotSerializer(serializers.Serializer):
+    start_time = serializers.DateTimeField()
+    end_time = serializers.DateTimeField()
 
 class ConsultantStatsSerializer(serializers.Serializer):
     total_appointments = serializers.IntegerField()
     completed_appointments = serializers.IntegerField()
     average_rating = serializers.FloatField()
 
+class ConsultantFuzzySearchSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=100)
+    # The trigram index operator already drops rows below the database threshold
+    min_similarity = serializers.FloatField(required=False, min_value=settings.TRIGRAM_WORD_SIMILARITY_THRESHOLD, max_value=1)
+
 class AppointmentCancelSerializer(serializers.Serializer):
     reason = serializers.CharField(required=False, allow_blank=True)
 
@@ -0,0 +1,61 @@
+## consultants/tasks.py
+
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import Appointment
+from services.tasks import queue_email_batches
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task
+def send_appointment_reminders() -> None:
+    """
+    Remind clients and consultants of appointments starting within the lead window.
+
+    Appointments are claimed in batches by stamping reminder_sent_at before
+    the emails are queued, so overlapping beat runs never remind twice.
+    """
+    now = timezone.now()
+    window_end = now + timezone.timedelta(hours=settings.APPOINTMENT_REMINDER_LEAD_HOURS)
+    batch_size = settings.CELERY_BULK_TASK_BATCH_SIZE
+
+    due_appointments = Appointment.objects.filter(
+        status='scheduled',
+        reminder_sent_at__isnull=True,
+        start_time__gt=now,
+        start_time__lte=window_end
+    ).order_by('start_time')
+
+    reminded = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                due_appointments.select_for_update(skip_locked=True, of=('self',)).values_list(
+                    'pk',
+                    'start_time',
+                    'project__project_name',
+                    'project__client__email',
+                    'consultant__user__email',
+                )[:batch_size]
+            )
+            if not batch:
+                break
+            Appointment.objects.filter(pk__in=[pk for pk, *_ in batch]).update(reminder_sent_at=now)
+
+        messages = []
+        for _, start_time, project_name, client_email, consultant_email in batch:
+            when = timezone.localtime(start_time).strftime('%B %d, %Y at %H:%M %Z')
+            for email in (client_email, consultant_email):
+                messages.append((
+                    "Upcoming Appointment Reminder",
+                    f"This is a reminder of your consultation for project '{project_name}' on {when}.",
+                    settings.DEFAULT_FROM_EMAIL,
+                    [email],
+                ))
+        queue_email_batches(messages)
+        reminded += len(batch)
+
+    logger.info(f"Queued reminders for {reminded} upcoming appointments.")
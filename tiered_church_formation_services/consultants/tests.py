@@ -0,0 +1,194 @@
+## consultants/tests.py
+
+import threading
+from datetime import time, timedelta
+import pytest
+from django.db import connection
+from django.utils import timezone
+from rest_framework.test import force_authenticate
+from services.models import ClientProject, ServiceTier
+from . import views
+from .models import Appointment, Consultant, ConsultantAvailability, ConsultantRating
+from .views import AppointmentDetailView, AppointmentListCreateView, ConsultantFuzzySearchView, ConsultantListView, ConsultantSearchView
+
+
+def create_consultants(make_user, clients, count):
+    for i in range(count):
+        consultant = Consultant.objects.create(
+            user=make_user(first_name='Consultant', last_name=f'{i:04d}'),
+            specialization='Church formation',
+            bio='Helps churches incorporate.',
+            hourly_rate=100,
+        )
+        for client in clients:
+            ConsultantRating.objects.create(consultant=consultant, client=client, rating=4)
+            consultant.record_rating(4)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('view, params', [
+    (ConsultantListView, {}),
+    (ConsultantSearchView, {'specialization': 'formation', 'min_rating': 3}),
+])
+def test_consultant_listing_query_count_is_constant(view, params, api_factory, make_user, django_assert_num_queries):
+    clients = [make_user(), make_user()]
+
+    def list_consultants():
+        request = api_factory.get('/', dict(params, page_size=100))
+        force_authenticate(request, user=clients[0])
+        with django_assert_num_queries(1):
+            response = view.as_view()(request)
+            response.render()
+        return response.data['results']
+
+    create_consultants(make_user, clients, 3)
+    assert len(list_consultants()) == 3
+
+    create_consultants(make_user, clients, 20)
+    results = list_consultants()
+    assert len(results) == 23
+    assert {result['average_rating'] for result in results} == {4.0}
+    assert {result['rating_count'] for result in results} == {2}
+
+
+
+@pytest.mark.django_db
+def test_list_pages_cover_tied_names_exactly_once(walk_pages, make_user):
+    # More namesakes than a page holds, so the cursor has to step through the tie
+    expected = {
+        Consultant.objects.create(
+            user=make_user(first_name='Pat', last_name='Lee'), specialization='Church formation', bio='Helps.', hourly_rate=100,
+        ).pk
+        for _ in range(11)
+    }
+
+    ids = walk_pages(ConsultantListView, make_user(), {'page_size': 3})
+
+    assert len(ids) == len(set(ids))
+    assert set(ids) == expected
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_bookings_for_one_slot_book_it_once(api_factory, make_user):
+    consultant = Consultant.objects.create(
+        user=make_user(), specialization='Church formation', bio='Helps churches incorporate.', hourly_rate=100,
+    )
+    ConsultantAvailability.objects.create(consultant=consultant, day_of_week=0, start_time=time(9), end_time=time(17))
+    tier = ServiceTier.objects.create(name='Standard', description='Standard tier.', price=1499)
+    clients = [make_user() for _ in range(8)]
+    projects = {
+        client.pk: ClientProject.objects.create(client=client, service_tier=tier, project_name='Church plant')
+        for client in clients
+    }
+
+    today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start_time = today + timedelta(days=7 - today.weekday(), hours=10)
+    barrier = threading.Barrier(len(clients))
+    outcomes = []
+
+    def book(client):
+        request = api_factory.post('/', {
+            'consultant': consultant.pk,
+            'project': projects[client.pk].pk,
+            'start_time': start_time.isoformat(),
+            'end_time': (start_time + timedelta(hours=1)).isoformat(),
+        }, format='json')
+        force_authenticate(request, user=client)
+        try:
+            barrier.wait()
+            outcomes.append(AppointmentListCreateView.as_view()(request).status_code)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=book, args=(client,)) for client in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(outcomes) == [201] + [400] * (len(clients) - 1)
+    assert Appointment.objects.filter(consultant=consultant).count() == 1
+
+
+@pytest.mark.django_db
+def test_rescheduling_onto_a_booked_slot_is_rejected(api_factory, make_user):
+    consultant = Consultant.objects.create(
+        user=make_user(), specialization='Church formation', bio='Helps churches incorporate.', hourly_rate=100,
+    )
+    tier = ServiceTier.objects.create(name='Standard', description='Standard tier.', price=1499)
+    client = make_user()
+    project = ClientProject.objects.create(client=client, service_tier=tier, project_name='Church plant')
+    start_time = timezone.now().replace(microsecond=0) + timedelta(days=7)
+    booked, moved = Appointment.objects.bulk_create(
+        Appointment(consultant=consultant, project=project, start_time=start, end_time=start + timedelta(hours=1))
+        for start in [start_time, start_time + timedelta(hours=2)]
+    )
+
+    request = api_factory.put('/', {
+        'start_time': (start_time + timedelta(minutes=30)).isoformat(),
+        'end_time': (start_time + timedelta(minutes=90)).isoformat(),
+    }, format='json')
+    force_authenticate(request, user=client)
+    response = AppointmentDetailView.as_view()(request, pk=moved.pk)
+
+    assert response.status_code == 400, response.data
+    moved.refresh_from_db()
+    assert moved.start_time == start_time + timedelta(hours=2)
+
+
+@pytest.mark.django_db
+def test_fuzzy_search_pages_cover_every_field_exactly_once(walk_pages, make_user):
+    clients = [make_user()]
+    create_consultants(make_user, clients, 9)
+    expected = set(Consultant.objects.values_list('pk', flat=True))
+    # Matched only through the joined user's name
+    expected.add(Consultant.objects.create(
+        user=make_user(first_name='Formation', last_name='Expert'), specialization='Tax', bio='Exemptions.', hourly_rate=100,
+    ).pk)
+    Consultant.objects.create(user=make_user(), specialization='Tax', bio='Exemptions.', hourly_rate=100)
+
+    ids = walk_pages(ConsultantFuzzySearchView, clients[0], {'q': 'formaton', 'page_size': 4})
+
+    assert len(ids) == len(set(ids))
+    assert set(ids) == expected
+
+
+@pytest.mark.django_db
+def test_fuzzy_search_rejects_similarity_below_database_threshold(api_factory, make_user, settings):
+    request = api_factory.get('/', {'q': 'formaton', 'min_similarity': settings.TRIGRAM_WORD_SIMILARITY_THRESHOLD / 2})
+    force_authenticate(request, user=make_user())
+    response = ConsultantFuzzySearchView.as_view()(request)
+    assert response.status_code == 400
+    assert 'min_similarity' in response.data
+
+
+@pytest.mark.parametrize('view, user, url_kwargs, params', [
+    (views.ConsultantListView, 'client', {}, {}),
+    (views.ConsultantSearchView, 'client', {}, {'specialization': 'formation'}),
+    (views.ConsultantFuzzySearchView, 'client', {}, {'q': 'formaton'}),
+    (views.AppointmentListCreateView, 'client', {}, {}),
+    (views.AppointmentListCreateView, 'consultant_user', {}, {}),
+    (views.AppointmentListCreateView, 'client', {}, {'view': 'summary'}),
+    (views.UpcomingAppointmentsView, 'client', {}, {}),
+    (views.UpcomingAppointmentsView, 'consultant_user', {}, {'view': 'summary'}),
+    (views.ConsultantRatingListView, 'client', {'pk': 'consultant'}, {}),
+    (views.ConsultantAvailabilityListCreateView, 'client', {'pk': 'consultant'}, {}),
+])
+def test_list_queries_are_constant_in_page_size(view, user, url_kwargs, params, assert_constant_queries):
+    assert_constant_queries(view, user, url_kwargs, params)
+
+
+@pytest.mark.django_db
+def test_deleted_ratings_leave_the_counters(make_user):
+    consultant = Consultant.objects.create(
+        user=make_user(), specialization='Church formation', bio='Helps churches incorporate.', hourly_rate=100,
+    )
+    clients = [make_user() for _ in range(3)]
+    for client, rating in zip(clients, [5, 4, 1]):
+        ConsultantRating.objects.create(consultant=consultant, client=client, rating=rating)
+        consultant.record_rating(rating)
+
+    ConsultantRating.objects.get(client=clients[2]).delete()
+    clients[1].delete()  # Cascades to the client's rating
+
+    consultant.refresh_from_db()
+    assert (consultant.rating_count, consultant.rating_sum) == (1, 5)
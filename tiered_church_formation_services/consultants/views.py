@@ -4,74 +4,124 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
-from django.db.models import Avg
+from django.db.models import ExpressionWrapper, F, FloatField
 from django.utils import timezone
+from datetime import datetime, time, timedelta
 from .models import Consultant, Appointment, ConsultantRating, ConsultantAvailability
 from .serializers import (
     ConsultantSerializer,
     AppointmentSerializer,
+    AppointmentSummarySerializer,
     ConsultantRatingSerializer,
-    ConsultantAvailabilitySerializer
+    ConsultantAvailabilitySerializer,
+    ConsultantSlotSearchSerializer,
+    ConsultantSlotSerializer,
+    ConsultantSearchSerializer,
+    ConsultantFuzzySearchSerializer,
 )
+from .scheduling import find_consultant_slots, filter_free_consultants, has_conflicting_appointment
 from services.models import ClientProject
-from django.core.exceptions import ValidationError
+from church_formation_project.pagination import RankedPagination
+from church_formation_project.trigram import fuzzy_search
+from rest_framework.exceptions import ValidationError
 from django.db import transaction
 
 class ConsultantListView(generics.ListAPIView):
-    queryset = Consultant.objects.all()
+    queryset = Consultant.objects.select_related('user')
     serializer_class = ConsultantSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 class ConsultantDetailView(generics.RetrieveAPIView):
-    queryset = Consultant.objects.all()
+    queryset = Consultant.objects.select_related('user')
     serializer_class = ConsultantSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-class AppointmentListCreateView(generics.ListCreateAPIView):
+class AppointmentListMixin:
+    """
+    Scope appointments to the requesting client or consultant and load the
+    whole serialized graph in the same query.
+
+    ``?view=summary`` switches reads to AppointmentSummarySerializer, which
+    only fetches ids, times, status and display names for calendar widgets.
+    """
+    summary_fields = [
+        'id', 'start_time', 'end_time', 'status', 'consultant', 'project', 'project__project_name',
+        'consultant__user', 'consultant__user__first_name', 'consultant__user__last_name',
+        'project__client', 'project__client__first_name', 'project__client__last_name',
+    ]
+
+    def is_summary(self):
+        return self.request.method == 'GET' and self.request.query_params.get('view') == 'summary'
+
+    def get_serializer_class(self):
+        if self.is_summary():
+            return AppointmentSummarySerializer
+        return super().get_serializer_class()
+
+    def get_user_appointments(self):
+        user = self.request.user
+        if hasattr(user, 'consultant_profile'):
+            queryset = Appointment.objects.filter(consultant=user.consultant_profile)
+        else:
+            queryset = Appointment.objects.filter(project__client=user)
+
+        if self.is_summary():
+            return queryset.select_related('consultant__user', 'project__client').only(*self.summary_fields)
+        return queryset.select_related('consultant__user', 'project__client', 'project__service_tier')
+
+class AppointmentListCreateView(AppointmentListMixin, generics.ListCreateAPIView):
     serializer_class = AppointmentSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        if hasattr(user, 'consultant_profile'):
-            return Appointment.objects.filter(consultant=user.consultant_profile)
-        return Appointment.objects.filter(project__client=user)
+        return self.get_user_appointments()
 
     def perform_create(self, serializer):
-        consultant = get_object_or_404(Consultant, pk=self.request.data.get('consultant'))
         project = get_object_or_404(ClientProject, pk=self.request.data.get('project'), client=self.request.user)
-        
+
         start_time = serializer.validated_data['start_time']
         end_time = serializer.validated_data['end_time']
 
-        # Check consultant availability
-        if not ConsultantAvailability.objects.filter(
-            consultant=consultant,
-            day_of_week=start_time.weekday(),
-            start_time__lte=start_time.time(),
-            end_time__gte=end_time.time()
-        ).exists():
-            raise ValidationError("The consultant is not available at this time.")
-
-        # Check for overlapping appointments
-        if Appointment.objects.filter(
-            consultant=consultant,
-            start_time__lt=end_time,
-            end_time__gt=start_time
-        ).exists():
-            raise ValidationError("This time slot is already booked.")
-
-        serializer.save(consultant=consultant, project=project)
-
-class AppointmentDetailView(generics.RetrieveUpdateDestroyAPIView):
+        with transaction.atomic():
+            # Lock the consultant row so concurrent bookings for the same consultant
+            # queue behind each other while other consultants stay bookable in parallel.
+            consultant = get_object_or_404(
+                Consultant.objects.select_for_update(), pk=self.request.data.get('consultant')
+            )
+
+            # Check consultant availability
+            if not ConsultantAvailability.objects.filter(
+                consultant=consultant,
+                day_of_week=start_time.weekday(),
+                start_time__lte=start_time.time(),
+                end_time__gte=end_time.time()
+            ).exists():
+                raise ValidationError("The consultant is not available at this time.")
+
+            # Check for overlapping appointments
+            if has_conflicting_appointment(consultant.pk, start_time, end_time):
+                raise ValidationError("This time slot is already booked.")
+
+            serializer.save(consultant=consultant, project=project)
+
+class AppointmentDetailView(AppointmentListMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = AppointmentSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        if hasattr(user, 'consultant_profile'):
-            return Appointment.objects.filter(consultant=user.consultant_profile)
-        return Appointment.objects.filter(project__client=user)
+        return self.get_user_appointments()
+
+    def perform_update(self, serializer):
+        appointment = serializer.instance
+        start_time = serializer.validated_data.get('start_time', appointment.start_time)
+        end_time = serializer.validated_data.get('end_time', appointment.end_time)
+
+        with transaction.atomic():
+            # Same per-consultant lock as booking, so a reschedule can't race a new booking.
+            Consultant.objects.select_for_update().get(pk=appointment.consultant_id)
+            if has_conflicting_appointment(appointment.consultant_id, start_time, end_time, exclude_pk=appointment.pk):
+                raise ValidationError("This time slot is already booked.")
+            serializer.save()
 
 class AppointmentCancelView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -117,7 +167,9 @@ class ConsultantRatingCreateView(generics.CreateAPIView):
         consultant = get_object_or_404(Consultant, pk=self.kwargs['pk'])
         if not Appointment.objects.filter(consultant=consultant, project__client=self.request.user, status='completed').exists():
             raise ValidationError("You can only rate consultants after completing an appointment with them.")
-        serializer.save(consultant=consultant, client=self.request.user)
+        with transaction.atomic():
+            rating = serializer.save(consultant=consultant, client=self.request.user)
+            consultant.record_rating(rating.rating)
 
 class ConsultantRatingListView(generics.ListAPIView):
     serializer_class = ConsultantRatingSerializer
@@ -125,7 +177,7 @@ class ConsultantRatingListView(generics.ListAPIView):
 
     def get_queryset(self):
         consultant = get_object_or_404(Consultant, pk=self.kwargs['pk'])
-        return ConsultantRating.objects.filter(consultant=consultant)
+        return ConsultantRating.objects.filter(consultant=consultant).select_related('client')
 
 class ConsultantAvailabilityListCreateView(generics.ListCreateAPIView):
     serializer_class = ConsultantAvailabilitySerializer
@@ -156,32 +208,92 @@ class ConsultantStatsView(APIView):
         stats = {
             'total_appointments': Appointment.objects.filter(consultant=consultant).count(),
             'completed_appointments': Appointment.objects.filter(consultant=consultant, status='completed').count(),
-            'average_rating': ConsultantRating.objects.filter(consultant=consultant).aggregate(Avg('rating'))['rating__avg']
+            'average_rating': consultant.average_rating
         }
         return Response(stats)
 
-class UpcomingAppointmentsView(generics.ListAPIView):
+class ConsultantSlotsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        consultant = get_object_or_404(Consultant, pk=pk)
+        serializer = ConsultantSlotSearchSerializer(data={
+            'start_date': request.query_params.get('from'),
+            'end_date': request.query_params.get('to'),
+            'duration': request.query_params.get('duration', 60),
+        })
+        serializer.is_valid(raise_exception=True)
+
+        slots = []
+        if consultant.is_available:
+            tz = timezone.get_current_timezone()
+            range_start = timezone.make_aware(datetime.combine(serializer.validated_data['start_date'], time.min), tz)
+            range_end = timezone.make_aware(
+                datetime.combine(serializer.validated_data['end_date'] + timedelta(days=1), time.min), tz
+            )
+            duration = timedelta(minutes=serializer.validated_data['duration'])
+            slots = find_consultant_slots(consultant.pk, range_start, range_end, duration)
+
+        return Response({
+            'consultant': consultant.pk,
+            'duration': serializer.validated_data['duration'],
+            'slots': ConsultantSlotSerializer(
+                [{'start_time': start, 'end_time': end} for start, end in slots], many=True
+            ).data,
+        })
+
+class UpcomingAppointmentsView(AppointmentListMixin, generics.ListAPIView):
     serializer_class = AppointmentSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        now = timezone.now()
-        if hasattr(user, 'consultant_profile'):
-            return Appointment.objects.filter(consultant=user.consultant_profile, start_time__gt=now, status='scheduled')
-        return Appointment.objects.filter(project__client=user, start_time__gt=now, status='scheduled')
+        return self.get_user_appointments().filter(
+            start_time__gt=timezone.now(), status='scheduled'
+        ).order_by('start_time')
 
 class ConsultantSearchView(generics.ListAPIView):
     serializer_class = ConsultantSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        queryset = Consultant.objects.all()
-        specialization = self.request.query_params.get('specialization', None)
+        serializer = ConsultantSearchSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        queryset = Consultant.objects.select_related('user')
+        specialization = params.get('specialization')
         if specialization:
             queryset = queryset.filter(specialization__icontains=specialization)
+        if params.get('min_rating'):
+            queryset = queryset.filter(
+                rating_count__gt=0,
+                rating_sum__gte=ExpressionWrapper(F('rating_count') * params['min_rating'], output_field=FloatField()),
+            )
+        if 'max_hourly_rate' in params:
+            queryset = queryset.filter(hourly_rate__lte=params['max_hourly_rate'])
+
+        # Availability mode: everyone free for the whole window, cheapest first.
+        if 'start_time' in params:
+            queryset = filter_free_consultants(queryset, params['start_time'], params['end_time'])
+            queryset = queryset.order_by('hourly_rate', 'user__last_name', 'user__first_name')
         return queryset
 
+class ConsultantFuzzySearchView(generics.ListAPIView):
+    serializer_class = ConsultantSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RankedPagination
+
+    def get_queryset(self):
+        serializer = ConsultantFuzzySearchSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        return fuzzy_search(
+            Consultant.objects.select_related('user'),
+            params['q'],
+            ['specialization', 'bio', 'user__first_name', 'user__last_name'],
+            params.get('min_similarity'),
+        )
+
 class ConsultantUpdateView(generics.UpdateAPIView):
     serializer_class = ConsultantSerializer
     permission_classes = [permissions.IsAuthenticated]
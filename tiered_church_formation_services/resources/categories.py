@@ -0,0 +1,44 @@
+## resources/categories.py
+
+import time
+from django.conf import settings
+from django.core.cache import cache
+from .models import ResourceCategory
+
+CATEGORY_TREE_VERSION_KEY = 'resource_category_tree_version'
+CATEGORY_TREE_CACHE_KEY = 'resource_category_tree_{version}'
+
+
+def build_category_tree() -> list:
+    """
+    Nest every category under its parent from one flat query, roots first and siblings by name.
+    """
+    nodes = {}
+    for category in ResourceCategory.objects.order_by('depth', 'name').values('id', 'name', 'description', 'parent_id', 'depth'):
+        nodes[category['id']] = dict(category, children=[])
+
+    tree = []
+    for node in nodes.values():
+        parent = nodes.get(node['parent_id'])
+        (parent['children'] if parent else tree).append(node)
+    return tree
+
+
+def cached_category_tree() -> list:
+    """
+    The category tree, cached until the next category write.
+    """
+    version = cache.get_or_set(CATEGORY_TREE_VERSION_KEY, time.time_ns, timeout=None)
+    cache_key = CATEGORY_TREE_CACHE_KEY.format(version=version)
+    tree = cache.get(cache_key)
+    if tree is None:
+        tree = build_category_tree()
+        cache.set(cache_key, tree, settings.CATEGORY_TREE_CACHE_TIMEOUT)
+    return tree
+
+
+def invalidate_category_tree() -> None:
+    """
+    Orphan the cached tree by moving to a new version; the old entry expires on its own.
+    """
+    cache.set(CATEGORY_TREE_VERSION_KEY, time.time_ns(), timeout=None)
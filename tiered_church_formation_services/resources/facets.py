@@ -0,0 +1,70 @@
+## resources/facets.py
+
+import hashlib
+import json
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import QuerySet
+from .models import ResourceCategory, ResourceCategoryAssignment
+
+FACETS_VERSION_KEY = 'resource_facets_version'
+FACETS_CACHE_KEY = 'resource_facets_{version}_{digest}'
+
+
+def count_facets(queryset: QuerySet) -> dict:
+    """
+    Count tags, file types and categories across ``queryset`` in one aggregate query.
+    """
+    filtered_sql, params = queryset.order_by().values('id', 'tags', 'file_type').distinct().query.sql_with_params()
+    assignments = ResourceCategoryAssignment._meta.db_table
+    categories = ResourceCategory._meta.db_table
+    sql = f"""
+        WITH filtered AS ({filtered_sql})
+        SELECT 'tags', NULL::bigint, tag.value, COUNT(*)
+            FROM filtered CROSS JOIN jsonb_array_elements_text(filtered.tags) AS tag(value)
+            GROUP BY tag.value
+        UNION ALL
+        SELECT 'file_types', NULL::bigint, filtered.file_type, COUNT(*)
+            FROM filtered
+            GROUP BY filtered.file_type
+        UNION ALL
+        SELECT 'categories', category.id, category.name, COUNT(*)
+            FROM filtered
+            JOIN {assignments} AS assignment ON assignment.resource_id = filtered.id
+            JOIN {categories} AS category ON category.id = assignment.category_id
+            GROUP BY category.id, category.name
+    """
+    facets = {'tags': [], 'file_types': [], 'categories': []}
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        for facet, category_id, value, count in cursor.fetchall():
+            entry = {'value': value, 'count': count}
+            if category_id is not None:
+                entry['id'] = category_id
+            facets[facet].append(entry)
+    for entries in facets.values():
+        entries.sort(key=lambda entry: (-entry['count'], entry['value']))
+    return facets
+
+
+def cached_facets(queryset: QuerySet, cache_params: dict) -> dict:
+    """
+    Facet counts for ``queryset``, cached per filter combination until the next resource write.
+    """
+    version = cache.get_or_set(FACETS_VERSION_KEY, time.time_ns, timeout=None)
+    digest = hashlib.md5(json.dumps(cache_params, sort_keys=True).encode()).hexdigest()
+    cache_key = FACETS_CACHE_KEY.format(version=version, digest=digest)
+    facets = cache.get(cache_key)
+    if facets is None:
+        facets = count_facets(queryset)
+        cache.set(cache_key, facets, settings.RESOURCE_FACETS_CACHE_TIMEOUT)
+    return facets
+
+
+def invalidate_resource_facets() -> None:
+    """
+    Orphan every cached facet count by moving to a new version; old entries expire on their own.
+    """
+    cache.set(FACETS_VERSION_KEY, time.time_ns(), timeout=None)
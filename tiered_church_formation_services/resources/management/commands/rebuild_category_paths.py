@@ -0,0 +1,41 @@
+## resources/management/commands/rebuild_category_paths.py
+
+from collections import defaultdict
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from resources.categories import invalidate_category_tree
+from resources.models import ResourceCategory
+
+
+class Command(BaseCommand):
+    help = 'Recompute the materialized path and depth of every resource category from the parent links.'
+
+    def handle(self, *args, **options):
+        children = defaultdict(list)
+        categories = {}
+        for category in ResourceCategory.objects.only('id', 'parent', 'path', 'depth'):
+            categories[category.pk] = category
+            children[category.parent_id].append(category)
+
+        # Walk down from the roots so every parent's path is final before its children use it
+        level = [(category, '/') for category in children[None]]
+        reachable = []
+        depth = 0
+        while level:
+            next_level = []
+            for category, parent_path in level:
+                category.path = f'{parent_path}{category.pk}/'
+                category.depth = depth
+                reachable.append(category)
+                next_level.extend((child, category.path) for child in children[category.pk])
+            level = next_level
+            depth += 1
+
+        with transaction.atomic():
+            ResourceCategory.objects.bulk_update(reachable, ['path', 'depth'], batch_size=1000)
+        invalidate_category_tree()
+
+        unreachable = len(categories) - len(reachable)
+        if unreachable:
+            self.stdout.write(self.style.WARNING(f'{unreachable} categories sit in a parent cycle and were left unchanged.'))
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt paths for {len(reachable)} categories.'))
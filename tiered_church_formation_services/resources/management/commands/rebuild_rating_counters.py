@@ -0,0 +1,31 @@
+## resources/management/commands/rebuild_rating_counters.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from resources.models import Resource, ResourceRating
+from consultants.models import Consultant, ConsultantRating
+
+
+def _rebuild(model, rating_model, related_field: str) -> int:
+    """
+    Recompute rating_count and rating_sum for every row of ``model`` in one UPDATE.
+    """
+    ratings = rating_model.objects.filter(**{related_field: OuterRef('pk')}).order_by().values(related_field)
+    return model.objects.update(
+        rating_count=Coalesce(Subquery(ratings.annotate(total=Count('id')).values('total')), 0),
+        rating_sum=Coalesce(Subquery(ratings.annotate(total=Sum('rating')).values('total')), 0),
+    )
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized rating counters on consultants and resources from the rating tables.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            consultants = _rebuild(Consultant, ConsultantRating, 'consultant')
+            resources = _rebuild(Resource, ResourceRating, 'resource')
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt rating counters for {consultants} consultants and {resources} resources.'
+        ))
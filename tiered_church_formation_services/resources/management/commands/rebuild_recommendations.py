@@ -0,0 +1,17 @@
+## resources/management/commands/rebuild_recommendations.py
+
+from django.core.management.base import BaseCommand
+from resources.models import ResourceAccess
+from resources.recommendations import refresh_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored resource recommendations for every user with resource activity.'
+
+    def handle(self, *args, **options):
+        user_ids = ResourceAccess.objects.order_by('user_id').values_list('user_id', flat=True).distinct()
+        users, stored = 0, 0
+        for user_id in user_ids.iterator():
+            stored += refresh_recommendations(user_id)
+            users += 1
+        self.stdout.write(self.style.SUCCESS(f'Stored {stored} recommendations for {users} users.'))
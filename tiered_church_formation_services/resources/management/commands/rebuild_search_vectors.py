@@ -0,0 +1,27 @@
+## resources/management/commands/rebuild_search_vectors.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from resources.models import Resource
+from resources.search import refresh_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Recompute the full-text search vector of every resource in primary key batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Resources updated per transaction.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk, updated = 0, 0
+        while True:
+            pks = list(
+                Resource.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                updated += refresh_search_vectors(Resource.objects.filter(pk__in=pks))
+            last_pk = pks[-1]
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt search vectors for {updated} resources.'))
@@ -1,7 +1,13 @@
 ## resources/models.py
 
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models.functions import Concat, Substr
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.core.validators import FileExtensionValidator
 
 class Resource(models.Model):
@@ -31,13 +37,44 @@ class Resource(models.Model):
         null=True,
         related_name='created_resources'
     )
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     def __str__(self):
         return self.title
 
+    @property
+    def average_rating(self):
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+    def record_rating(self, rating: int, previous_rating: int = None):
+        """
+        Fold a new or changed rating into the stored counters with a single UPDATE.
+        """
+        updates = {'rating_sum': models.F('rating_sum') + (rating - (previous_rating or 0))}
+        if previous_rating is None:
+            updates['rating_count'] = models.F('rating_count') + 1
+        Resource.objects.filter(pk=self.pk).update(**updates)
+
+    def update_search_vector(self):
+        """
+        Recompute the stored search vector after the resource or its categories change.
+        """
+        from .search import refresh_search_vectors
+        refresh_search_vectors(Resource.objects.filter(pk=self.pk))
+        # Keep the in-memory copy current so a later save() doesn't write back a stale vector
+        self.refresh_from_db(fields=['search_vector'])
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
+            GinIndex(fields=['search_vector']),
+            GinIndex(fields=['title'], name='resource_title_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['tags'], name='resource_tags_gin', opclasses=['jsonb_path_ops']),
+            models.Index(fields=['-created_at']),
             models.Index(fields=['file_type']),
             models.Index(fields=['is_premium']),
         ]
@@ -50,6 +87,9 @@ class ResourceAccess(models.Model):
     class Meta:
         unique_together = ['user', 'resource']
         ordering = ['-accessed_at']
+        indexes = [
+            models.Index(fields=['user', '-accessed_at']),
+        ]
 
     def __str__(self):
         return f"{self.user.email} accessed {self.resource.title}"
@@ -73,13 +113,87 @@ class ResourceCategory(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
     parent = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='children')
+    # Materialized path of ancestor ids including this one, e.g. "/3/17/42/"; maintained by save()
+    path = models.CharField(max_length=255, default='', editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if not update_fields & {'parent', 'parent_id'}:
+                super().save(*args, **kwargs)
+                transaction.on_commit(self._invalidate_tree)
+                return
+            # A moved category's path and depth must be written along with its parent
+            kwargs['update_fields'] = update_fields | {'path', 'depth'}
+
+        with transaction.atomic():
+            # Lock this row and the parent's before reading their paths. A concurrent move of
+            # either, or of an ancestor, rewrites these rows, so it finishes first and the
+            # paths read here are current rather than whatever this instance was loaded with.
+            current = {
+                pk: (path, depth)
+                for pk, path, depth in ResourceCategory.objects.select_for_update()
+                .filter(pk__in=[pk for pk in (self.pk, self.parent_id) if pk is not None])
+                .order_by('pk')
+                .values_list('pk', 'path', 'depth')
+            }
+            parent_path = '/'
+            if self.parent_id:
+                if self.parent_id not in current:
+                    raise ResourceCategory.DoesNotExist(f"ResourceCategory {self.parent_id} does not exist.")
+                parent_path = current[self.parent_id][0]
+
+            if self.pk is None:
+                super().save(*args, **kwargs)
+                self.path = f'{parent_path}{self.pk}/'
+                self.depth = parent_path.count('/') - 1
+                ResourceCategory.objects.filter(pk=self.pk).update(path=self.path, depth=self.depth)
+            else:
+                # Callers validate moves first (see ResourceCategorySerializer.validate_parent)
+                old_path, old_depth = current.get(self.pk, (self.path, self.depth))
+                self.path = f'{parent_path}{self.pk}/'
+                self.depth = parent_path.count('/') - 1
+                super().save(*args, **kwargs)
+                if old_path and old_path != self.path:
+                    self._move_descendants(old_path, self.path, self.depth - old_depth)
+            transaction.on_commit(self._invalidate_tree)
+
+    def delete(self, *args, **kwargs):
+        # Children are re-rooted by SET_NULL, which bypasses save(); rewrite their subtrees here
+        with transaction.atomic():
+            for child in self.children.select_for_update().order_by('pk'):
+                self._move_descendants(child.path, f'/{child.pk}/', -child.depth)
+            deleted = super().delete(*args, **kwargs)
+            transaction.on_commit(self._invalidate_tree)
+            return deleted
+
+    @staticmethod
+    def _invalidate_tree():
+        from .categories import invalidate_category_tree
+        invalidate_category_tree()
+
+    @staticmethod
+    def _move_descendants(old_path: str, new_path: str, depth_delta: int) -> None:
+        """
+        Rewrite the path prefix of every category under ``old_path`` in one UPDATE.
+        """
+        ResourceCategory.objects.filter(path__startswith=old_path).update(
+            path=Concat(models.Value(new_path), Substr('path', len(old_path) + 1)),
+            depth=models.F('depth') + depth_delta,
+        )
+
     class Meta:
         verbose_name_plural = "Resource Categories"
         ordering = ['name']
+        indexes = [
+            # varchar_pattern_ops lets subtree lookups (path LIKE '/3/17/%') use the index
+            models.Index(fields=['path'], name='category_path_idx', opclasses=['varchar_pattern_ops']),
+        ]
 
 class ResourceCategoryAssignment(models.Model):
     resource = models.ForeignKey(Resource, on_delete=models.CASCADE, related_name='category_assignments')
@@ -90,3 +204,35 @@ class ResourceCategoryAssignment(models.Model):
 
     def __str__(self):
         return f"{self.resource.title} - {self.category.name}"
+
+class ResourceRecommendation(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='resource_recommendations')
+    resource = models.ForeignKey(Resource, on_delete=models.CASCADE, related_name='recommendations')
+    score = models.FloatField()
+    computed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['user', 'resource']
+        indexes = [
+            models.Index(fields=['user', '-score']),
+        ]
+
+    def __str__(self):
+        return f"{self.resource.title} for {self.user.email}: {self.score:.3f}"
+
+class RecommendationState(models.Model):
+    # When the user's recommendations were last computed, kept even when that produced none
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='recommendation_state')
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Recommendations for {self.user.email} computed at {self.computed_at}"
+
+@receiver(post_delete, sender=ResourceRating)
+def forget_deleted_resource_rating(sender, instance, **kwargs):
+    # Admin deletes and cascades from a deleted user never pass through the rating views
+    Resource.objects.filter(pk=instance.resource_id).update(
+        rating_sum=models.F('rating_sum') - instance.rating,
+        rating_count=models.F('rating_count') - 1,
+    )
+    transaction.on_commit(lambda: cache.delete(f'resource_stats_{instance.resource_id}'))
@@ -0,0 +1,121 @@
+## resources/recommendations.py
+
+from collections import Counter
+from functools import reduce
+from operator import or_
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from .models import RecommendationState, Resource, ResourceAccess, ResourceRating, ResourceRecommendation
+
+# Users sharing the most accessed resources with the target user whose activity is considered.
+NEIGHBOUR_LIMIT = 200
+# Strongest tags from the user's history used to find tag-overlap candidates.
+TAG_LIMIT = 10
+# Newest resources carrying those tags that are scored for overlap.
+TAG_CANDIDATE_LIMIT = 500
+# Blend of the normalized co-occurrence and tag-overlap scores.
+CO_OCCURRENCE_WEIGHT = 0.6
+TAG_OVERLAP_WEIGHT = 0.4
+# A neighbour's high rating counts this much on top of their access.
+LIKED_BONUS = 0.5
+
+
+def seed_weights(user_id: int) -> dict:
+    """
+    Return {resource_id: weight} for everything the user has accessed or rated.
+
+    A plain access weighs 1; a rating rescales that by rating / 3, so a
+    5-star resource pulls harder than an unrated one and a 1-star one barely
+    pulls at all.
+    """
+    seeds = dict.fromkeys(ResourceAccess.objects.filter(user_id=user_id).values_list('resource_id', flat=True), 1.0)
+    for resource_id, rating in ResourceRating.objects.filter(user_id=user_id).values_list('resource_id', 'rating'):
+        seeds[resource_id] = rating / 3
+    return seeds
+
+
+def co_occurrence_scores(user_id: int, seeds: dict) -> Counter:
+    """
+    Score unseen resources by how often users with overlapping history accessed or liked them.
+    """
+    neighbours = dict(
+        ResourceAccess.objects.filter(resource_id__in=seeds).exclude(user_id=user_id)
+        .values('user_id').annotate(overlap=Count('id')).order_by('-overlap')
+        .values_list('user_id', 'overlap')[:NEIGHBOUR_LIMIT]
+    )
+    scores = Counter()
+    if not neighbours:
+        return scores
+
+    accesses = ResourceAccess.objects.filter(user_id__in=neighbours).exclude(resource_id__in=seeds)
+    for neighbour_id, resource_id in accesses.values_list('user_id', 'resource_id'):
+        scores[resource_id] += neighbours[neighbour_id]
+    liked = ResourceRating.objects.filter(user_id__in=neighbours, rating__gte=4).exclude(resource_id__in=seeds)
+    for neighbour_id, resource_id in liked.values_list('user_id', 'resource_id'):
+        scores[resource_id] += neighbours[neighbour_id] * LIKED_BONUS
+    return scores
+
+
+def tag_overlap_scores(seeds: dict) -> Counter:
+    """
+    Score unseen resources by the weight of the user's tags they share.
+    """
+    tag_weights = Counter()
+    for resource_id, tags in Resource.objects.filter(pk__in=seeds).values_list('pk', 'tags'):
+        for tag in set(tags):
+            tag_weights[tag] += seeds[resource_id]
+    top_tags = [tag for tag, _ in tag_weights.most_common(TAG_LIMIT)]
+
+    scores = Counter()
+    if not top_tags:
+        return scores
+    candidates = Resource.objects.filter(reduce(or_, (Q(tags__contains=[tag]) for tag in top_tags)))\
+        .exclude(pk__in=seeds).order_by('-created_at').values_list('pk', 'tags')[:TAG_CANDIDATE_LIMIT]
+    for resource_id, tags in candidates:
+        scores[resource_id] = sum(tag_weights[tag] for tag in set(tags))
+    return scores
+
+
+def _normalized(scores: Counter) -> dict:
+    top = max(scores.values(), default=0)
+    return {key: value / top for key, value in scores.items()} if top else {}
+
+
+def compute_recommendations(user_id: int, limit: int = None) -> list:
+    """
+    Return the user's top ``limit`` [(resource_id, score), ...], best first.
+    """
+    limit = limit or settings.RECOMMENDATION_COUNT
+    seeds = seed_weights(user_id)
+    if not seeds:
+        return []
+
+    co_occurrence = _normalized(co_occurrence_scores(user_id, seeds))
+    tag_overlap = _normalized(tag_overlap_scores(seeds))
+    blended = Counter()
+    for resource_id, score in co_occurrence.items():
+        blended[resource_id] += CO_OCCURRENCE_WEIGHT * score
+    for resource_id, score in tag_overlap.items():
+        blended[resource_id] += TAG_OVERLAP_WEIGHT * score
+    return blended.most_common(limit)
+
+
+def refresh_recommendations(user_id: int) -> int:
+    """
+    Recompute and replace the user's stored recommendations. Returns how many were stored.
+
+    The computation time is recorded in RecommendationState even when nothing
+    is stored, so a user without recommendations is not recomputed on every
+    sweep and every request.
+    """
+    recommendations = compute_recommendations(user_id)
+    with transaction.atomic():
+        ResourceRecommendation.objects.filter(user_id=user_id).delete()
+        ResourceRecommendation.objects.bulk_create(
+            ResourceRecommendation(user_id=user_id, resource_id=resource_id, score=score)
+            for resource_id, score in recommendations
+        )
+        RecommendationState.objects.update_or_create(user_id=user_id, defaults={'computed_at': timezone.now()})
+    return len(recommendations)
@@ -0,0 +1,55 @@
+## resources/search.py
+
+import re
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, OuterRef, QuerySet, Subquery, TextField
+from .models import ResourceCategoryAssignment
+
+SEARCH_CONFIG = 'english'
+
+
+def search_document() -> SearchVector:
+    """
+    Weighted tsvector over a resource's title (A), tags and category names (B) and description (C).
+    """
+    category_names = ResourceCategoryAssignment.objects.filter(resource=OuterRef('pk')).order_by()\
+        .values('resource').annotate(names=StringAgg('category__name', delimiter=' ')).values('names')
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('tags', weight='B', config=SEARCH_CONFIG)
+        + SearchVector(Subquery(category_names, output_field=TextField()), weight='B', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def refresh_search_vectors(queryset: QuerySet) -> int:
+    """
+    Recompute search_vector for every resource in ``queryset`` in one UPDATE.
+    """
+    return queryset.update(search_vector=search_document())
+
+
+def build_search_query(text: str):
+    """
+    Turn free text into a tsquery where every word must match as a prefix, or None if it has no words.
+    """
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        return None
+    return SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_resources(queryset: QuerySet, text: str) -> QuerySet:
+    """
+    Filter ``queryset`` through the GIN-indexed search vector and order by relevance.
+
+    Ties on rank fall back to newest first, then to the primary key, so the
+    order is total and page boundaries are stable.
+    """
+    query = build_search_query(text)
+    if query is None:
+        return queryset.order_by('-created_at', '-pk')
+    return queryset.filter(search_vector=query)\
+        .annotate(rank=SearchRank(F('search_vector'), query))\
+        .order_by('-rank', '-created_at', '-pk')
@@ -1,5 +1,6 @@
 ## resources/serializers.py
 
+from django.conf import settings
 from rest_framework import serializers
 from .models import Resource, ResourceRating, ResourceCategory, ResourceCategoryAssignment
 from users.serializers import UserSerializer
@@ -7,23 +8,35 @@ from users.serializers import UserSerializer
 class ResourceCategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = ResourceCategory
-        fields = ['id', 'name', 'description', 'parent']
+        fields = ['id', 'name', 'description', 'parent', 'depth']
+        read_only_fields = ['depth']
+
+    def validate_parent(self, parent):
+        if parent is not None and self.instance is not None and parent.path.startswith(self.instance.path):
+            raise serializers.ValidationError("A category cannot be moved under itself or its descendants.")
+        return parent
 
 class ResourceSerializer(serializers.ModelSerializer):
     created_by = UserSerializer(read_only=True)
-    categories = ResourceCategorySerializer(many=True, read_only=True, source='category_assignments.category')
+    categories = serializers.SerializerMethodField()
 
     class Meta:
         model = Resource
         fields = ['id', 'title', 'description', 'file_type', 'file_url', 'tags', 'is_premium', 'created_at', 'updated_at', 'created_by', 'categories']
         read_only_fields = ['id', 'created_at', 'updated_at', 'created_by']
 
+    def get_categories(self, obj):
+        # Reads through category_assignments so list views can prefetch 'category_assignments__category'
+        categories = [assignment.category for assignment in obj.category_assignments.all()]
+        return ResourceCategorySerializer(categories, many=True).data
+
     def create(self, validated_data):
         categories_data = self.context.get('request').data.get('categories', [])
         resource = Resource.objects.create(**validated_data)
         for category_id in categories_data:
             category = ResourceCategory.objects.get(id=category_id)
             ResourceCategoryAssignment.objects.create(resource=resource, category=category)
+        resource.update_search_vector()
         return resource
 
     def update(self, instance, validated_data):
@@ -33,6 +46,7 @@ class ResourceSerializer(serializers.ModelSerializer):
         for category_id in categories_data:
             category = ResourceCategory.objects.get(id=category_id)
             ResourceCategoryAssignment.objects.create(resource=instance, category=category)
+        instance.update_search_vector()
         return instance
 
 class ResourceDetailSerializer(ResourceSerializer):
@@ -40,7 +54,8 @@ class ResourceDetailSerializer(ResourceSerializer):
     user_rating = serializers.SerializerMethodField()
 
     class Meta(ResourceSerializer.Meta):
-        fields = ResourceSerializer.Meta.fields + ['average_rating', 'user_rating']
+        fields = ResourceSerializer.Meta.fields + ['average_rating', 'rating_count', 'user_rating']
+        read_only_fields = ResourceSerializer.Meta.read_only_fields + ['rating_count']
 
     def get_user_rating(self, obj):
         user = self.context['request'].user
@@ -72,6 +87,11 @@ class ResourceCategoryDetailSerializer(ResourceCategorySerializer):
 class ResourceSearchSerializer(serializers.Serializer):
     query = serializers.CharField(required=True, max_length=100)
 
+class ResourceFuzzySearchSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=100)
+    # The trigram index operator already drops rows below the database threshold
+    min_similarity = serializers.FloatField(required=False, min_value=settings.TRIGRAM_WORD_SIMILARITY_THRESHOLD, max_value=1)
+
 class ResourceStatsSerializer(serializers.Serializer):
     access_count = serializers.IntegerField()
     average_rating = serializers.FloatField()
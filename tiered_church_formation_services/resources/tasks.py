@@ -0,0 +1,56 @@
+## resources/tasks.py
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from .models import RecommendationState, ResourceAccess
+from .recommendations import refresh_recommendations
+import logging
+
+logger = logging.getLogger(__name__)
+
+RECOMMENDATION_PENDING_KEY = 'recommendation_refresh_pending_{user_id}'
+
+def schedule_recommendation_refresh(user_id: int) -> bool:
+    """
+    Queue a recommendation refresh for the user unless one is already pending.
+
+    Accesses and ratings arriving within RECOMMENDATION_REFRESH_DEBOUNCE_SECONDS
+    collapse into one delayed refresh_user_recommendations run. Returns
+    whether a new task was queued.
+    """
+    debounce = settings.RECOMMENDATION_REFRESH_DEBOUNCE_SECONDS
+    # The key outlives the countdown so a lost task only delays, never blocks, the next refresh.
+    if not cache.add(RECOMMENDATION_PENDING_KEY.format(user_id=user_id), True, timeout=debounce * 5):
+        return False
+    refresh_user_recommendations.apply_async((user_id,), countdown=debounce)
+    return True
+
+@shared_task
+def refresh_user_recommendations(user_id: int) -> None:
+    """
+    Recompute one user's stored recommendations.
+    """
+    # Clear the pending marker first so activity from here on schedules a fresh run.
+    cache.delete(RECOMMENDATION_PENDING_KEY.format(user_id=user_id))
+    stored = refresh_recommendations(user_id)
+    logger.info(f"Stored {stored} recommendations for user {user_id}.")
+
+@shared_task
+def refresh_stale_recommendations() -> int:
+    """
+    Queue refreshes for users whose recommendations predate RECOMMENDATION_MAX_AGE_HOURS.
+
+    Incremental refreshes only react to a user's own activity; this sweep
+    folds in what everyone else has accessed and rated since. Returns the
+    number of refreshes queued.
+    """
+    cutoff = timezone.now() - timezone.timedelta(hours=settings.RECOMMENDATION_MAX_AGE_HOURS)
+    fresh = RecommendationState.objects.filter(user_id=OuterRef('user_id'), computed_at__gte=cutoff)
+    stale_users = ResourceAccess.objects.filter(~Exists(fresh)).order_by().values_list('user_id', flat=True).distinct()
+
+    queued = sum(schedule_recommendation_refresh(user_id) for user_id in stale_users.iterator())
+    logger.info(f"Queued recommendation refreshes for {queued} users.")
+    return queued
@@ -0,0 +1,239 @@
+## resources/tests.py
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import force_authenticate
+from . import views
+from .models import (
+    RecommendationState, Resource, ResourceAccess, ResourceCategory, ResourceCategoryAssignment, ResourceRating,
+)
+from .serializers import ResourceCategorySerializer
+from .tasks import refresh_stale_recommendations
+from .search import refresh_search_vectors
+from .views import (
+    ResourceCategoryTreeView, ResourceFacetView, ResourceFuzzySearchView, ResourceListView, ResourceSearchView,
+)
+
+
+
+@pytest.mark.django_db
+def test_list_pages_cover_tied_timestamps_exactly_once(walk_pages, make_user):
+    Resource.objects.bulk_create(
+        Resource(title=f'Guide {i}', description='Governance', file_type='pdf', file_url=f'resources/{i}.pdf')
+        for i in range(11)
+    )
+    Resource.objects.update(created_at=timezone.now())
+
+    ids = walk_pages(ResourceListView, make_user(), {'page_size': 3})
+
+    assert len(ids) == len(set(ids))
+    assert set(ids) == set(Resource.objects.values_list('pk', flat=True))
+
+@pytest.mark.django_db
+def test_search_pages_cover_tied_ranks_exactly_once(walk_pages, make_user):
+    user = make_user()
+    # Identical documents rank identically, the worst case for paging on rank
+    resources = Resource.objects.bulk_create(
+        Resource(title='Bylaws guide', description='Governance', file_type='pdf', file_url=f'resources/{i}.pdf', tags=['bylaws'])
+        for i in range(23)
+    )
+    resources += Resource.objects.bulk_create(
+        Resource(title='Bylaws guide for boards', description='Bylaws and governance', file_type='pdf',
+                 file_url=f'resources/boards-{i}.pdf', tags=['bylaws', 'boards'])
+        for i in range(7)
+    )
+    Resource.objects.create(title='Budget template', description='Finance', file_type='pdf', file_url='resources/budget.pdf')
+    refresh_search_vectors(Resource.objects.all())
+
+    ids = walk_pages(ResourceSearchView, user, {'q': 'bylaws', 'page_size': 4})
+
+    assert len(ids) == len(set(ids))
+    assert set(ids) == {resource.pk for resource in resources}
+
+
+
+@pytest.mark.django_db
+def test_search_hides_premium_resources_without_access(walk_pages, make_user):
+    free = Resource.objects.create(title='Bylaws guide', description='Governance', file_type='pdf', file_url='resources/free.pdf')
+    premium = Resource.objects.create(title='Bylaws guide', description='Governance', file_type='pdf',
+                                      file_url='resources/premium.pdf', is_premium=True)
+    refresh_search_vectors(Resource.objects.all())
+
+    assert walk_pages(ResourceSearchView, make_user(), {'q': 'bylaws'}) == [free.pk]
+    assert set(walk_pages(ResourceSearchView, make_user(is_staff=True), {'q': 'bylaws'})) == {free.pk, premium.pk}
+
+@pytest.mark.django_db
+def test_fuzzy_search_pages_cover_tied_similarities_exactly_once(walk_pages, make_user):
+    user = make_user()
+    resources = Resource.objects.bulk_create(
+        Resource(title='Bylaws guide', description='Governance', file_type='pdf', file_url=f'resources/{i}.pdf')
+        for i in range(13)
+    )
+    Resource.objects.create(title='Budget template', description='Finance', file_type='pdf', file_url='resources/budget.pdf')
+
+    ids = walk_pages(ResourceFuzzySearchView, user, {'q': 'bylas', 'page_size': 4})
+
+    assert len(ids) == len(set(ids))
+    assert set(ids) == {resource.pk for resource in resources}
+
+
+@pytest.mark.django_db
+def test_fuzzy_search_hides_premium_resources_without_access(walk_pages, make_user):
+    free = Resource.objects.create(title='Bylaws guide', description='Governance', file_type='pdf', file_url='resources/free.pdf')
+    premium = Resource.objects.create(title='Bylaws guide', description='Governance', file_type='pdf',
+                                      file_url='resources/premium.pdf', is_premium=True)
+
+    assert walk_pages(ResourceFuzzySearchView, make_user(), {'q': 'bylas'}) == [free.pk]
+    assert set(walk_pages(ResourceFuzzySearchView, make_user(is_staff=True), {'q': 'bylas'})) == {free.pk, premium.pk}
+
+
+@pytest.mark.django_db
+def test_facets_count_tags_file_types_and_categories(api_factory, make_user):
+    user = make_user()
+    legal = ResourceCategory.objects.create(name='Legal')
+    bylaws = Resource.objects.create(title='Bylaws guide', description='Governance', file_type='pdf',
+                                     file_url='resources/bylaws.pdf', tags=['bylaws', 'governance'])
+    budget = Resource.objects.create(title='Budget template', description='Finance', file_type='doc',
+                                     file_url='resources/budget.doc', tags=['governance'])
+    ResourceCategoryAssignment.objects.bulk_create(
+        ResourceCategoryAssignment(resource=resource, category=legal) for resource in (bylaws, budget)
+    )
+
+    request = api_factory.get('/')
+    force_authenticate(request, user=user)
+    response = ResourceFacetView.as_view()(request)
+
+    assert response.status_code == 200, response.data
+    assert response.data == {
+        'tags': [{'value': 'governance', 'count': 2}, {'value': 'bylaws', 'count': 1}],
+        'file_types': [{'value': 'doc', 'count': 1}, {'value': 'pdf', 'count': 1}],
+        'categories': [{'value': 'Legal', 'count': 2, 'id': legal.pk}],
+    }
+
+
+@pytest.mark.django_db
+def test_category_cannot_move_under_its_descendant():
+    root = ResourceCategory.objects.create(name='Legal')
+    child = ResourceCategory.objects.create(name='Bylaws', parent=root)
+
+    serializer = ResourceCategorySerializer(root, data={'parent': child.pk}, partial=True)
+
+    assert not serializer.is_valid()
+    assert 'parent' in serializer.errors
+
+
+@pytest.mark.django_db
+def test_category_save_with_update_fields_moves_subtree():
+    legal = ResourceCategory.objects.create(name='Legal')
+    finance = ResourceCategory.objects.create(name='Finance')
+    bylaws = ResourceCategory.objects.create(name='Bylaws', parent=legal)
+    minutes = ResourceCategory.objects.create(name='Minutes', parent=bylaws)
+
+    bylaws.parent = finance
+    bylaws.save(update_fields=['parent'])
+
+    bylaws.refresh_from_db()
+    minutes.refresh_from_db()
+    assert (bylaws.path, bylaws.depth) == (f'/{finance.pk}/{bylaws.pk}/', 1)
+    assert (minutes.path, minutes.depth) == (f'/{finance.pk}/{bylaws.pk}/{minutes.pk}/', 2)
+
+
+
+@pytest.mark.django_db
+def test_category_move_from_a_stale_instance_moves_current_subtree():
+    legal = ResourceCategory.objects.create(name='Legal')
+    finance = ResourceCategory.objects.create(name='Finance')
+    tax = ResourceCategory.objects.create(name='Tax')
+    bylaws = ResourceCategory.objects.create(name='Bylaws', parent=legal)
+    minutes = ResourceCategory.objects.create(name='Minutes', parent=bylaws)
+    stale_bylaws = ResourceCategory.objects.get(pk=bylaws.pk)
+
+    # An ancestor moves after the instance was loaded, rewriting the paths under it
+    legal.parent = finance
+    legal.save()
+    stale_bylaws.parent = tax
+    stale_bylaws.save(update_fields=['parent'])
+
+    stale_bylaws.refresh_from_db()
+    minutes.refresh_from_db()
+    assert (stale_bylaws.path, stale_bylaws.depth) == (f'/{tax.pk}/{bylaws.pk}/', 1)
+    assert (minutes.path, minutes.depth) == (f'/{tax.pk}/{bylaws.pk}/{minutes.pk}/', 2)
+
+@pytest.mark.django_db
+def test_category_tree_reflects_category_writes(api_factory, make_user, django_capture_on_commit_callbacks):
+    user = make_user()
+
+    def tree():
+        request = api_factory.get('/')
+        force_authenticate(request, user=user)
+        response = ResourceCategoryTreeView.as_view()(request)
+        assert response.status_code == 200, response.data
+        return [(node['name'], [child['name'] for child in node['children']]) for node in response.data]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        legal = ResourceCategory.objects.create(name='Legal')
+    assert tree() == [('Legal', [])]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        bylaws = ResourceCategory.objects.create(name='Bylaws', parent=legal)
+    assert tree() == [('Legal', ['Bylaws'])]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        legal.delete()
+    assert tree() == [('Bylaws', [])]
+
+    bylaws.refresh_from_db()
+    with django_capture_on_commit_callbacks(execute=True):
+        bylaws.name = 'Governance'
+        bylaws.save(update_fields=['name'])
+    assert tree() == [('Governance', [])]
+
+
+@pytest.mark.parametrize('view, user, url_kwargs, params', [
+    (views.ResourceListView, 'client', {}, {}),
+    (views.ResourceCategoryListView, 'client', {}, {}),
+    (views.ResourceCategoryTreeView, 'client', {}, {}),
+    (views.ResourceSearchView, 'client', {}, {'q': 'guide'}),
+    (views.ResourceFuzzySearchView, 'client', {}, {'q': 'gide'}),
+    (views.UserResourceAccessListView, 'client', {}, {}),
+    (views.RecommendedResourcesView, 'client', {}, {}),
+])
+def test_list_queries_are_constant_in_page_size(view, user, url_kwargs, params, assert_constant_queries):
+    assert_constant_queries(view, user, url_kwargs, params)
+
+
+@pytest.mark.django_db
+def test_users_without_recommendations_are_refreshed_once(api_factory, make_user, monkeypatch):
+    user = make_user()
+    # A lone untagged resource nobody else accessed yields no recommendations
+    resource = Resource.objects.create(title='Bylaws guide', description='Governance', file_type='pdf', file_url='resources/bylaws.pdf')
+    ResourceAccess.objects.create(user=user, resource=resource)
+
+    assert refresh_stale_recommendations() == 1
+    assert RecommendationState.objects.filter(user=user).exists()
+    assert refresh_stale_recommendations() == 0
+
+    scheduled = []
+    monkeypatch.setattr(views, 'schedule_recommendation_refresh', scheduled.append)
+    request = api_factory.get('/')
+    force_authenticate(request, user=user)
+    response = views.RecommendedResourcesView.as_view()(request)
+
+    assert response.status_code == 200
+    assert response.data == []
+    assert scheduled == []
+
+
+@pytest.mark.django_db
+def test_deleted_ratings_leave_the_counters(make_user):
+    resource = Resource.objects.create(title='Bylaws guide', description='Governance', file_type='pdf', file_url='resources/bylaws.pdf')
+    users = [make_user() for _ in range(3)]
+    for user, rating in zip(users, [5, 4, 1]):
+        ResourceRating.objects.create(user=user, resource=resource, rating=rating)
+        resource.record_rating(rating)
+
+    ResourceRating.objects.filter(user=users[2]).delete()
+    users[1].delete()  # Cascades to the user's rating
+
+    resource.refresh_from_db()
+    assert (resource.rating_count, resource.rating_sum) == (1, 5)
@@ -4,19 +4,58 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
-from django.db.models import Avg, Q, Count
-from .models import Resource, ResourceAccess, ResourceRating, ResourceCategory
+from django.db.models import F
+from .models import Resource, ResourceAccess, ResourceRating, ResourceCategory, RecommendationState
 from .serializers import (
     ResourceSerializer,
     ResourceDetailSerializer,
     ResourceRatingSerializer,
     ResourceCategorySerializer,
+    ResourceFuzzySearchSerializer,
+    RecommendedResourceSerializer,
 )
-from services.models import ClientProject
+from .search import search_resources
+from .categories import cached_category_tree
+from .facets import cached_facets, invalidate_resource_facets
+from .tasks import schedule_recommendation_refresh
+from services.entitlements import has_premium_access
+from church_formation_project.pagination import RankedPagination
+from church_formation_project.trigram import fuzzy_search
 from django.core.exceptions import PermissionDenied
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from django.core.cache import cache
+from django.db import transaction
+
+RESOURCE_FILTER_PARAMS = ['category', 'category_id', 'tags', 'file_type']
+
+def filter_resources(queryset, query_params, include_premium: bool):
+    category = query_params.get('category')
+    category_id = query_params.get('category_id')
+    tags = query_params.get('tags')
+    file_type = query_params.get('file_type')
+
+    if category:
+        queryset = queryset.filter(category_assignments__category__name=category)
+    if category_id:
+        if not category_id.isdigit():
+            return queryset.none()
+        # The category and its whole subtree, via a prefix match on the indexed materialized path
+        path = ResourceCategory.objects.filter(pk=category_id).values_list('path', flat=True).first()
+        if path is None:
+            return queryset.none()
+        queryset = queryset.filter(category_assignments__category__path__startswith=path)
+    if tags:
+        # jsonb containment, served by the jsonb_path_ops GIN index on tags
+        queryset = queryset.filter(tags__contains=tags.split(','))
+    if file_type:
+        queryset = queryset.filter(file_type=file_type)
+
+    # Check user's access to premium resources
+    if not include_premium:
+        queryset = queryset.filter(is_premium=False)
+
+    return queryset.distinct()
 
 class ResourceListView(generics.ListAPIView):
     serializer_class = ResourceSerializer
@@ -27,30 +66,18 @@ class ResourceListView(generics.ListAPIView):
         return super().list(request, *args, **kwargs)
 
     def get_queryset(self):
-        user = self.request.user
         queryset = Resource.objects.all().select_related('created_by').prefetch_related('category_assignments__category')
+        return filter_resources(queryset, self.request.query_params, has_premium_access(self.request.user))
 
-        # Apply filters
-        category = self.request.query_params.get('category')
-        tags = self.request.query_params.get('tags')
-        file_type = self.request.query_params.get('file_type')
-
-        if category:
-            queryset = queryset.filter(category_assignments__category__name=category)
-        if tags:
-            queryset = queryset.filter(tags__contains=tags.split(','))
-        if file_type:
-            queryset = queryset.filter(file_type=file_type)
-
-        # Check user's access to premium resources
-        if not user.is_staff:
-            active_projects = ClientProject.objects.filter(client=user, status='in_progress').exists()
-            if active_projects:
-                queryset = queryset.filter(Q(is_premium=False) | Q(is_premium=True))
-            else:
-                queryset = queryset.filter(is_premium=False)
+class ResourceFacetView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
 
-        return queryset.distinct()
+    def get(self, request):
+        include_premium = has_premium_access(request.user)
+        queryset = filter_resources(Resource.objects.all(), request.query_params, include_premium)
+        cache_params = {param: request.query_params.get(param) for param in RESOURCE_FILTER_PARAMS}
+        cache_params['include_premium'] = include_premium
+        return Response(cached_facets(queryset, cache_params))
 
 class ResourceDetailView(generics.RetrieveAPIView):
     serializer_class = ResourceDetailSerializer
@@ -62,12 +89,12 @@ class ResourceDetailView(generics.RetrieveAPIView):
         instance = self.get_object()
         user = request.user
 
-        if instance.is_premium and not user.is_staff:
-            active_projects = ClientProject.objects.filter(client=user, status='in_progress').exists()
-            if not active_projects:
-                raise PermissionDenied("You don't have access to this premium resource.")
+        if instance.is_premium and not has_premium_access(user):
+            raise PermissionDenied("You don't have access to this premium resource.")
 
-        ResourceAccess.objects.get_or_create(user=user, resource=instance)
+        _, created = ResourceAccess.objects.get_or_create(user=user, resource=instance)
+        if created:
+            schedule_recommendation_refresh(user.pk)
 
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
@@ -78,8 +105,11 @@ class ResourceRatingCreateView(generics.CreateAPIView):
 
     def perform_create(self, serializer):
         resource = get_object_or_404(Resource, pk=self.kwargs['pk'])
-        serializer.save(user=self.request.user, resource=resource)
+        with transaction.atomic():
+            rating = serializer.save(user=self.request.user, resource=resource)
+            resource.record_rating(rating.rating)
         cache.delete(f'resource_stats_{resource.pk}')
+        schedule_recommendation_refresh(self.request.user.pk)
 
 class ResourceRatingUpdateView(generics.UpdateAPIView):
     serializer_class = ResourceRatingSerializer
@@ -87,8 +117,15 @@ class ResourceRatingUpdateView(generics.UpdateAPIView):
     queryset = ResourceRating.objects.select_related('resource')
 
     def perform_update(self, serializer):
-        serializer.save()
+        with transaction.atomic():
+            # Lock the rating row so concurrent edits apply their deltas in turn.
+            previous_rating = ResourceRating.objects.select_for_update().values_list(
+                'rating', flat=True
+            ).get(pk=serializer.instance.pk)
+            rating = serializer.save()
+            rating.resource.record_rating(rating.rating, previous_rating=previous_rating)
         cache.delete(f'resource_stats_{serializer.instance.resource.pk}')
+        schedule_recommendation_refresh(self.request.user.pk)
 
 class ResourceCategoryListView(generics.ListAPIView):
     serializer_class = ResourceCategorySerializer
@@ -99,17 +136,37 @@ class ResourceCategoryListView(generics.ListAPIView):
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+class ResourceCategoryTreeView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response(cached_category_tree())
+
 class ResourceSearchView(generics.ListAPIView):
     serializer_class = ResourceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RankedPagination
 
     def get_queryset(self):
         query = self.request.query_params.get('q', '')
-        return Resource.objects.filter(
-            Q(title__icontains=query) | 
-            Q(description__icontains=query) |
-            Q(tags__contains=[query])
-        ).distinct()
+        queryset = Resource.objects.select_related('created_by').prefetch_related('category_assignments__category')
+        if not has_premium_access(self.request.user):
+            queryset = queryset.filter(is_premium=False)
+        return search_resources(queryset, query)
+
+class ResourceFuzzySearchView(generics.ListAPIView):
+    serializer_class = ResourceSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RankedPagination
+
+    def get_queryset(self):
+        serializer = ResourceFuzzySearchSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        queryset = Resource.objects.select_related('created_by').prefetch_related('category_assignments__category')
+        if not has_premium_access(self.request.user):
+            queryset = queryset.filter(is_premium=False)
+        return fuzzy_search(queryset, params['q'], ['title'], params.get('min_similarity'))
 
 class ResourceStatsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -122,7 +179,7 @@ class ResourceStatsView(APIView):
             resource = get_object_or_404(Resource, pk=pk)
             stats = {
                 'access_count': ResourceAccess.objects.filter(resource=resource).count(),
-                'average_rating': ResourceRating.objects.filter(resource=resource).aggregate(Avg('rating'))['rating__avg']
+                'average_rating': resource.average_rating
             }
             cache.set(cache_key, stats, 60 * 5)  # Cache for 5 minutes
 
@@ -134,24 +191,35 @@ class UserResourceAccessListView(generics.ListAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return Resource.objects.filter(user_accesses__user=user).distinct()
+        # One access row per (user, resource), so the join needs no DISTINCT
+        return Resource.objects.filter(user_accesses__user=user).select_related('created_by')\
+            .prefetch_related('category_assignments__category')\
+            .annotate(accessed_at=F('user_accesses__accessed_at'))\
+            .order_by('-accessed_at')
 
 class RecommendedResourcesView(generics.ListAPIView):
-    serializer_class = ResourceSerializer
+    serializer_class = RecommendedResourceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None  # Already capped at ten results
 
     def get_queryset(self):
+        # One read of the user's precomputed top-N through the (user, -score) index
         user = self.request.user
-        accessed_resources = ResourceAccess.objects.filter(user=user).values_list('resource', flat=True)
-        user_tags = Resource.objects.filter(id__in=accessed_resources).values_list('tags', flat=True)
-        
-        user_tags = set(tag for tags in user_tags for tag in tags)
-        
-        return Resource.objects.exclude(id__in=accessed_resources)\
-            .filter(tags__overlap=list(user_tags))\
-            .annotate(tag_count=Count('tags'))\
-            .order_by('-tag_count', '-created_at')\
-            .distinct()[:10]
+        queryset = Resource.objects.filter(recommendations__user=user)\
+            .select_related('created_by')\
+            .prefetch_related('category_assignments__category')\
+            .annotate(relevance_score=F('recommendations__score'))\
+            .order_by('-relevance_score')
+        if not has_premium_access(user):
+            queryset = queryset.filter(is_premium=False)
+        return queryset[:10]
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if not response.data and not RecommendationState.objects.filter(user=request.user).exists():
+            # Nothing computed yet, e.g. a new user: build the list in the background
+            schedule_recommendation_refresh(request.user.pk)
+        return response
 
 class ResourceUploadView(generics.CreateAPIView):
     serializer_class = ResourceSerializer
@@ -159,6 +227,7 @@ class ResourceUploadView(generics.CreateAPIView):
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
+        invalidate_resource_facets()
 
 class ResourceUpdateView(generics.UpdateAPIView):
     serializer_class = ResourceSerializer
@@ -168,6 +237,7 @@ class ResourceUpdateView(generics.UpdateAPIView):
     def perform_update(self, serializer):
         serializer.save()
         cache.delete(f'resource_stats_{serializer.instance.pk}')
+        invalidate_resource_facets()
 
 class ResourceDeleteView(generics.DestroyAPIView):
     permission_classes = [permissions.IsAdminUser]
@@ -176,3 +246,4 @@ class ResourceDeleteView(generics.DestroyAPIView):
     def perform_destroy(self, instance):
         cache.delete(f'resource_stats_{instance.pk}')
         instance.delete()
+        invalidate_resource_facets()
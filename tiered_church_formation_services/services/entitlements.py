@@ -0,0 +1,45 @@
+## services/entitlements.py
+
+from django.conf import settings
+from django.core.cache import cache
+from .models import ClientProject
+
+PREMIUM_ACCESS_CACHE_KEY = 'premium_access_{user_id}'
+
+
+def premium_access_cache_key(user_id: int) -> str:
+    return PREMIUM_ACCESS_CACHE_KEY.format(user_id=user_id)
+
+
+def has_premium_access(user) -> bool:
+    """
+    Return whether the user may see premium content.
+
+    Staff always have access; everyone else needs a project in progress. The
+    answer is cached per user so repeated resource browsing does not hit the
+    database, and is invalidated whenever one of the user's projects changes
+    status.
+    """
+    if user.is_staff:
+        return True
+
+    cache_key = premium_access_cache_key(user.pk)
+    has_access = cache.get(cache_key)
+    if has_access is None:
+        has_access = ClientProject.objects.filter(client_id=user.pk, status='in_progress').exists()
+        cache.set(cache_key, has_access, settings.PREMIUM_ACCESS_CACHE_TIMEOUT)
+    return has_access
+
+
+def invalidate_premium_access(user_id: int) -> None:
+    """
+    Drop the cached premium access flag for a user.
+    """
+    cache.delete(premium_access_cache_key(user_id))
+
+
+def invalidate_premium_access_many(user_ids) -> None:
+    """
+    Drop the cached premium access flags for several users at once.
+    """
+    cache.delete_many([premium_access_cache_key(user_id) for user_id in set(user_ids)])
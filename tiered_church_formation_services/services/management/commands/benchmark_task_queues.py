@@ -0,0 +1,91 @@
+## services/management/commands/benchmark_task_queues.py
+
+import json
+import time
+
+from celery import signals
+from celery.contrib.testing.worker import start_worker
+from celery.fixups.django import DjangoFixup
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from church_formation_project.celery import app, WORKER_TOPOLOGY, worker_rate_limit
+from services.tasks import benchmark_probe
+
+# The task whose rate limit bounds each queue's throughput.
+QUEUE_RATE_LIMIT_TASKS = {
+    'payments': 'services.tasks.process_payment_task',
+    'notifications': 'services.tasks.send_email_batch',
+    'status': 'services.tasks.update_project_status_task',
+    'reports': 'services.tasks.generate_monthly_report',
+}
+
+# The reports queue is limited to a task per minute by design, so it is opt-in.
+DEFAULT_QUEUES = ['payments', 'notifications', 'status', 'celery']
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure sustained tasks/sec per Celery queue against an in-memory broker, '
+        'using the worker topology concurrency and the configured rate limits.'
+    )
+    # Measures Celery alone; URL and model checks have no bearing on it
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=200, help='Tasks sent to each queue.')
+        parser.add_argument('--work-ms', type=float, default=0, help='Simulated work per task in milliseconds.')
+        parser.add_argument('--queues', nargs='+', default=DEFAULT_QUEUES, choices=list(WORKER_TOPOLOGY))
+        parser.add_argument(
+            '--no-rate-limits', action='store_true',
+            help='Ignore TASK_RATE_LIMITS and measure raw pipeline throughput.'
+        )
+
+    def handle(self, *args, **options):
+        app.conf.update(
+            # Namespaced keys, or the CELERY_* values from settings take precedence
+            CELERY_BROKER_URL='memory://',
+            CELERY_RESULT_BACKEND='cache+memory://',
+            # The memory transport polls once a second by default
+            CELERY_BROKER_TRANSPORT_OPTIONS={'polling_interval': 0.001},
+            # Without an async transport the worker only processes acks between 2 s polls, so with
+            # a prefetch of one every slot would idle after each task. Reserving the whole run leaves
+            # pool concurrency and the rate limits as the only bounds, as with Redis in production.
+            CELERY_WORKER_PREFETCH_MULTIPLIER=options['tasks'],
+            CELERY_TASK_ALWAYS_EAGER=False,
+            worker_hijack_root_logger=False,
+        )
+        # manage.py has already set Django up; the fixup would run the system checks again as the worker starts
+        for fixup in app._fixups:
+            if isinstance(fixup, DjangoFixup):
+                signals.import_modules.disconnect(fixup.on_import_modules)
+        work_seconds = options['work_ms'] / 1000
+
+        results = {}
+        for queue in options['queues']:
+            rate_limit = None
+            task_name = QUEUE_RATE_LIMIT_TASKS.get(queue)
+            if not options['no_rate_limits'] and task_name in settings.TASK_RATE_LIMITS:
+                # One worker instance is started, so it gets that instance's share of the budget
+                rate_limit = worker_rate_limit(task_name, settings.TASK_RATE_LIMITS[task_name])
+            benchmark_probe.rate_limit = rate_limit
+            concurrency = WORKER_TOPOLOGY[queue]['concurrency']
+
+            with start_worker(app, pool='threads', concurrency=concurrency, queues=[queue], perform_ping_check=False):
+                started = time.perf_counter()
+                pending = [
+                    benchmark_probe.apply_async((work_seconds,), queue=queue)
+                    for _ in range(options['tasks'])
+                ]
+                for result in pending:
+                    result.get(timeout=None, interval=0.001)
+                elapsed = time.perf_counter() - started
+
+            results[queue] = {
+                'tasks': options['tasks'],
+                'concurrency': concurrency,
+                'rate_limit': rate_limit,
+                'seconds': round(elapsed, 3),
+                'tasks_per_second': round(options['tasks'] / elapsed, 2),
+            }
+
+        self.stdout.write(json.dumps(results, indent=2))
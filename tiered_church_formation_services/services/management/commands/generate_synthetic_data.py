@@ -0,0 +1,256 @@
+## services/management/commands/generate_synthetic_data.py
+
+import random
+import uuid
+from datetime import time, timedelta
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from users.models import User, UserProfile, UserPreferences
+from services.models import ServiceTier, ClientProject, ProjectStep, Payment
+from services.tasks import chunked
+from resources.models import Resource, ResourceAccess, ResourceRating, ResourceCategory, ResourceCategoryAssignment
+from consultants.models import Consultant, Appointment, ConsultantRating, ConsultantAvailability
+
+# Rows generated per unit of --scale.
+BASE_COUNTS = {
+    'clients': 1000,
+    'consultants': 50,
+    'projects_per_client': 1.5,
+    'appointments_per_project': 2,
+    'consultant_ratings_per_client': 1,
+    'resources': 500,
+    'accesses_per_client': 10,
+    'resource_ratings_per_client': 3,
+}
+
+PROJECT_STEPS = ['intake', 'bylaws', 'articles_of_incorporation', 'ein_application', 'tax_exemption', 'bank_account']
+SPECIALIZATIONS = ['Church formation', 'Nonprofit law', 'Tax exemption', 'Governance', 'Church finance', 'Compliance']
+TAGS = ['bylaws', 'governance', 'tax', '501c3', 'finance', 'leadership', 'compliance', 'legal', 'templates', 'planning']
+CATEGORY_TREE = {
+    'Legal': ['Incorporation', 'Bylaws', 'Contracts', 'Employment'],
+    'Finance': ['Budgeting', 'Payroll', 'Donations', 'Audits'],
+    'Tax': ['Exemption', 'Filings', 'Clergy Tax'],
+    'Governance': ['Boards', 'Policies', 'Minutes'],
+    'Ministry': ['Worship', 'Outreach', 'Discipleship'],
+}
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic users, consultants, schedules, projects, payments, resources and ratings for load testing.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0, help='Multiplier applied to the base row counts.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk_create statement.')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible datasets.')
+        parser.add_argument('--password', default='synthetic-password', help='Password set on every generated user.')
+
+    def handle(self, *args, **options):
+        if options['scale'] <= 0:
+            raise CommandError('--scale must be positive.')
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.run_id = uuid.uuid4().hex[:8]
+        self.password = make_password(options['password'])
+        counts = {name: value * options['scale'] for name, value in BASE_COUNTS.items()}
+
+        clients = self._create_users('client', int(counts['clients']))
+        consultants = self._create_consultants(max(1, int(counts['consultants'])))
+        tiers = self._create_tiers()
+        projects = self._create_projects(clients, tiers, counts['projects_per_client'])
+        self._create_payments(projects, tiers)
+        self._create_appointments(projects, consultants, counts['appointments_per_project'])
+        self._create_consultant_ratings(clients, consultants, counts['consultant_ratings_per_client'])
+        categories = self._create_categories()
+        resources = self._create_resources(int(counts['resources']), categories)
+        self._create_resource_activity(clients, resources, counts['accesses_per_client'], counts['resource_ratings_per_client'])
+
+        call_command('rebuild_category_paths', stdout=self.stdout)
+        call_command('rebuild_rating_counters', stdout=self.stdout)
+        call_command('rebuild_search_vectors', batch_size=self.batch_size, stdout=self.stdout)
+        call_command('rebuild_recommendations', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated synthetic dataset {self.run_id}: {len(clients)} clients, {len(consultants)} consultants, '
+            f'{len(projects)} projects, {len(resources)} resources.'
+        ))
+
+    def _bulk_create(self, model, objects) -> list:
+        created = []
+        for batch in chunked(objects, self.batch_size):
+            created.extend(model.objects.bulk_create(batch))
+        return created
+
+    def _sample_count(self, mean: float) -> int:
+        """
+        Integer count around ``mean`` so fractional per-row rates average out.
+        """
+        whole = int(mean)
+        return whole + (1 if self.rng.random() < mean - whole else 0)
+
+    def _create_users(self, role: str, count: int) -> list:
+        users = self._bulk_create(User, (
+            User(
+                email=f'synthetic-{role}-{self.run_id}-{i}@example.com',
+                first_name=role.title(),
+                last_name=f'{i:06d}',
+                password=self.password,
+            )
+            for i in range(count)
+        ))
+        self._bulk_create(UserProfile, (UserProfile(user=user, organization=f'Church {user.last_name}') for user in users))
+        self._bulk_create(UserPreferences, (UserPreferences(user=user) for user in users))
+        return users
+
+    def _create_consultants(self, count: int) -> list:
+        users = self._create_users('consultant', count)
+        consultants = self._bulk_create(Consultant, (
+            Consultant(
+                user=user,
+                specialization=self.rng.choice(SPECIALIZATIONS),
+                bio='Synthetic consultant for load testing.',
+                hourly_rate=self.rng.randrange(50, 300),
+            )
+            for user in users
+        ))
+        self._bulk_create(ConsultantAvailability, (
+            ConsultantAvailability(consultant=consultant, day_of_week=day, start_time=time(9, 0), end_time=time(17, 0))
+            for consultant in consultants
+            for day in range(5)
+        ))
+        return consultants
+
+    def _create_tiers(self) -> list:
+        return self._bulk_create(ServiceTier, (
+            ServiceTier(
+                name=f'{name} ({self.run_id})',
+                description=f'Synthetic {name.lower()} tier.',
+                price=price,
+                is_full_service=name == 'Full Service',
+                features=['consultation', 'templates'],
+            )
+            for name, price in [('Starter', 499), ('Standard', 1499), ('Premium', 2999), ('Full Service', 4999)]
+        ))
+
+    def _create_projects(self, clients, tiers, per_client: float) -> list:
+        statuses = ['pending', 'in_progress', 'in_progress', 'completed', 'cancelled']
+        projects = []
+        for client in clients:
+            for _ in range(self._sample_count(per_client)):
+                status = self.rng.choice(statuses)
+                done = len(PROJECT_STEPS) if status == 'completed' else self.rng.randrange(len(PROJECT_STEPS))
+                progress = {step: 'completed' if i < done else 'pending' for i, step in enumerate(PROJECT_STEPS)}
+                projects.append(ClientProject(
+                    client=client,
+                    service_tier=self.rng.choice(tiers),
+                    project_name=f'Synthetic church plant {client.last_name}',
+                    start_date=timezone.now() - timedelta(days=self.rng.randrange(365)),
+                    status=status,
+                    progress=progress,
+                    total_steps=len(progress),
+                    completed_steps=done,
+                ))
+        projects = self._bulk_create(ClientProject, projects)
+        self._bulk_create(ProjectStep, (
+            ProjectStep(project=project, name=name, status=status)
+            for project in projects
+            for name, status in project.progress.items()
+        ))
+        return projects
+
+    def _create_payments(self, projects, tiers) -> None:
+        payment_status = {'pending': 'pending', 'in_progress': 'completed', 'completed': 'completed', 'cancelled': 'refunded'}
+        prices = {tier.pk: tier.price for tier in tiers}
+        self._bulk_create(Payment, (
+            Payment(
+                user_id=project.client_id,
+                amount=prices[project.service_tier_id],
+                stripe_charge_id=f'synthetic_{self.run_id}_{project.pk}',
+                status=payment_status[project.status],
+            )
+            for project in projects
+        ))
+
+    def _create_appointments(self, projects, consultants, per_project: float) -> None:
+        """
+        Book appointments inside each consultant's weekday 9-5 window without overlaps.
+        """
+        today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        next_monday = today + timedelta(days=7 - today.weekday())
+        next_slot = {consultant.pk: 0 for consultant in consultants}
+
+        def slot_start(index: int):
+            day, hour = divmod(index, 8)
+            week, weekday = divmod(day, 5)
+            return next_monday + timedelta(weeks=week, days=weekday, hours=9 + hour)
+
+        appointments = []
+        for project in projects:
+            if project.status == 'cancelled':
+                continue
+            for _ in range(self._sample_count(per_project)):
+                consultant = self.rng.choice(consultants)
+                start = slot_start(next_slot[consultant.pk])
+                next_slot[consultant.pk] += 1
+                appointments.append(Appointment(
+                    consultant=consultant,
+                    project=project,
+                    start_time=start,
+                    end_time=start + timedelta(hours=1),
+                    status='scheduled',
+                ))
+        self._bulk_create(Appointment, appointments)
+
+    def _create_consultant_ratings(self, clients, consultants, per_client: float) -> None:
+        ratings = []
+        for client in clients:
+            rated = self.rng.sample(consultants, min(len(consultants), self._sample_count(per_client)))
+            ratings.extend(
+                ConsultantRating(consultant=consultant, client=client, rating=self.rng.randint(3, 5))
+                for consultant in rated
+            )
+        self._bulk_create(ConsultantRating, ratings)
+
+    def _create_categories(self) -> list:
+        roots = self._bulk_create(ResourceCategory, (
+            ResourceCategory(name=f'{name} ({self.run_id})', description=f'Synthetic {name.lower()} resources.')
+            for name in CATEGORY_TREE
+        ))
+        children = self._bulk_create(ResourceCategory, (
+            ResourceCategory(name=f'{child} ({self.run_id})', parent=root)
+            for root, name in zip(roots, CATEGORY_TREE)
+            for child in CATEGORY_TREE[name]
+        ))
+        return roots + children
+
+    def _create_resources(self, count: int, categories) -> list:
+        file_types = [choice for choice, _ in Resource.FILE_TYPE_CHOICES]
+        resources = self._bulk_create(Resource, (
+            Resource(
+                title=f'Synthetic {self.rng.choice(TAGS)} guide {i}',
+                description=f'Synthetic resource covering {", ".join(self.rng.sample(TAGS, 3))}.',
+                file_type=self.rng.choice(file_types),
+                file_url=f'resources/synthetic-{self.run_id}-{i}.pdf',
+                tags=self.rng.sample(TAGS, self.rng.randint(1, 4)),
+                is_premium=self.rng.random() < 0.3,
+            )
+            for i in range(count)
+        ))
+        self._bulk_create(ResourceCategoryAssignment, (
+            ResourceCategoryAssignment(resource=resource, category=category)
+            for resource in resources
+            for category in self.rng.sample(categories, self.rng.randint(1, 2))
+        ))
+        return resources
+
+    def _create_resource_activity(self, clients, resources, accesses_per_client: float, ratings_per_client: float) -> None:
+        accesses, ratings = [], []
+        for client in clients:
+            accessed = self.rng.sample(resources, min(len(resources), self._sample_count(accesses_per_client)))
+            accesses.extend(ResourceAccess(user=client, resource=resource) for resource in accessed)
+            rated = accessed[:self._sample_count(ratings_per_client)]
+            ratings.extend(
+                ResourceRating(user=client, resource=resource, rating=self.rng.randint(1, 5)) for resource in rated
+            )
+        self._bulk_create(ResourceAccess, accesses)
+        self._bulk_create(ResourceRating, ratings)
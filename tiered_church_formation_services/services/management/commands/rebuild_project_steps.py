@@ -0,0 +1,39 @@
+## services/management/commands/rebuild_project_steps.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from services.models import ClientProject, ProjectStep
+from services.tasks import chunked
+
+
+class Command(BaseCommand):
+    help = 'Rebuild ProjectStep rows and the step counters on ClientProject from the progress column.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Projects processed per transaction.')
+
+    def handle(self, *args, **options):
+        projects = ClientProject.objects.order_by('pk').values_list('pk', 'progress').iterator(chunk_size=options['batch_size'])
+
+        rebuilt = 0
+        for batch in chunked(projects, options['batch_size']):
+            project_ids = [pk for pk, _ in batch]
+            with transaction.atomic():
+                ProjectStep.objects.filter(project_id__in=project_ids).delete()
+                ProjectStep.objects.bulk_create(
+                    ProjectStep(project_id=pk, name=name, status=status)
+                    for pk, progress in batch
+                    for name, status in progress.items()
+                )
+                steps = ProjectStep.objects.filter(project=OuterRef('pk')).order_by().values('project')
+                ClientProject.objects.filter(pk__in=project_ids).update(
+                    total_steps=Coalesce(Subquery(steps.annotate(total=Count('id')).values('total')), 0),
+                    completed_steps=Coalesce(
+                        Subquery(steps.annotate(total=Count('id', filter=Q(status='completed'))).values('total')), 0
+                    ),
+                )
+            rebuilt += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt steps for {rebuilt} projects.'))
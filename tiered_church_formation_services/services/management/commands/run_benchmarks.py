@@ -0,0 +1,144 @@
+## services/management/commands/run_benchmarks.py
+
+import json
+import subprocess
+import time
+import uuid
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from church_formation_project.middleware import percentile
+from users.models import User
+from services import views as service_views
+from resources import views as resource_views
+from consultants.models import Consultant
+from consultants import views as consultant_views
+
+# (label, view, acting user, URL kwargs, query params)
+BENCHMARKS = [
+    ('ServiceTierListView', service_views.ServiceTierListView, 'client', {}, {}),
+    ('ClientProjectListCreateView', service_views.ClientProjectListCreateView, 'client', {}, {}),
+    ('PaymentListView', service_views.PaymentListView, 'client', {}, {}),
+    ('ResourceListView', resource_views.ResourceListView, 'client', {}, {}),
+    ('ResourceCategoryTreeView', resource_views.ResourceCategoryTreeView, 'client', {}, {}),
+    ('ResourceFacetView', resource_views.ResourceFacetView, 'client', {}, {}),
+    ('ResourceSearchView', resource_views.ResourceSearchView, 'client', {}, {'q': 'guide'}),
+    ('ResourceFuzzySearchView', resource_views.ResourceFuzzySearchView, 'client', {}, {'q': 'gide'}),
+    ('RecommendedResourcesView', resource_views.RecommendedResourcesView, 'client', {}, {}),
+    ('ConsultantListView', consultant_views.ConsultantListView, 'client', {}, {}),
+    ('ConsultantSearchView', consultant_views.ConsultantSearchView, 'client', {}, {'specialization': 'formation'}),
+    ('ConsultantFuzzySearchView', consultant_views.ConsultantFuzzySearchView, 'client', {}, {'q': 'formaton'}),
+    ('ConsultantSlotsView', consultant_views.ConsultantSlotsView, 'client', {'pk': 'consultant'}, {'duration': 60}),
+    ('AppointmentListCreateView', consultant_views.AppointmentListCreateView, 'client', {}, {}),
+    ('UpcomingAppointmentsView', consultant_views.UpcomingAppointmentsView, 'client', {}, {}),
+    ('ConsultantRatingListView', consultant_views.ConsultantRatingListView, 'client', {'pk': 'consultant'}, {}),
+]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the main read endpoints in-process against the current database and report '
+        'throughput and p50/p95/p99 latency per endpoint as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Timed requests per endpoint.')
+        parser.add_argument('--warmup', type=int, default=10, help='Untimed requests per endpoint before measuring.')
+        parser.add_argument('--users', type=int, default=50, help='Distinct clients the requests rotate through.')
+        parser.add_argument('--endpoints', nargs='+', choices=[label for label, *_ in BENCHMARKS],
+                            help='Only run these endpoints.')
+        parser.add_argument('--bypass-cache', action='store_true',
+                            help='Add a unique query parameter so cache_page never serves a response.')
+        parser.add_argument('--output', default=None, help='Write the JSON report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        clients = list(User.objects.filter(projects__isnull=False).distinct().order_by('pk')[:options['users']])
+        consultant = Consultant.objects.filter(is_available=True).order_by('pk').first()
+        if not clients or consultant is None:
+            raise CommandError('No clients with projects or consultants found; run generate_synthetic_data first.')
+
+        # The default 'testserver' host is not in ALLOWED_HOSTS, so absolute pagination links would raise DisallowedHost
+        self.factory = APIRequestFactory(SERVER_NAME='localhost')
+        self.bypass_cache = options['bypass_cache']
+        selected = options['endpoints']
+        actors = {'consultant': consultant}
+
+        results = {}
+        for label, view, user_key, url_kwargs, params in BENCHMARKS:
+            if selected and label not in selected:
+                continue
+            kwargs = {key: actors[value].pk for key, value in url_kwargs.items()}
+            params = self._resolve_params(params)
+            for i in range(options['warmup']):
+                self._call(label, view, clients[i % len(clients)], kwargs, params)
+            results[label] = self._measure(label, view, clients, kwargs, params, options['requests'])
+
+        report = {
+            'commit': git_commit(),
+            'timestamp': timezone.now().isoformat(),
+            'requests_per_endpoint': options['requests'],
+            'users': len(clients),
+            'bypass_cache': self.bypass_cache,
+            'endpoints': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Benchmark report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def _resolve_params(self, params: dict) -> dict:
+        if 'duration' not in params:
+            return params
+        start = timezone.now() + timedelta(days=1)
+        return dict(params, **{'from': start.date().isoformat(), 'to': (start + timedelta(days=7)).date().isoformat()})
+
+    def _call(self, label, view, user, kwargs, params) -> None:
+        """
+        Make one request, failing the run on anything but a 2xx so errors are never timed as samples.
+        """
+        query = dict(params, _=uuid.uuid4().hex) if self.bypass_cache else params
+        request = self.factory.get('/', query)
+        force_authenticate(request, user=user)
+        # Rolled back so any writes a view makes leave the dataset identical between runs
+        with transaction.atomic():
+            response = view.as_view()(request, **kwargs)
+            response.render()
+            transaction.set_rollback(True)
+        if not 200 <= response.status_code < 300:
+            raise CommandError(f'{label} returned {response.status_code}: {response.content[:500].decode(errors="replace")}')
+
+    def _measure(self, label, view, clients, kwargs, params, count: int) -> dict:
+        latencies = []
+        started = time.perf_counter()
+        for i in range(count):
+            request_started = time.perf_counter()
+            self._call(label, view, clients[i % len(clients)], kwargs, params)
+            latencies.append((time.perf_counter() - request_started) * 1000)
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'requests': count,
+            'seconds': round(elapsed, 3),
+            'requests_per_second': round(count / elapsed, 2) if elapsed else None,
+            'latency_ms': {
+                'p50': round(percentile(latencies, 0.50), 2),
+                'p95': round(percentile(latencies, 0.95), 2),
+                'p99': round(percentile(latencies, 0.99), 2),
+                'max': round(latencies[-1], 2) if latencies else 0.0,
+            },
+        }
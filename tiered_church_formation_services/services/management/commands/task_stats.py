@@ -0,0 +1,19 @@
+## services/management/commands/task_stats.py
+
+import json
+from django.core.management.base import BaseCommand
+from church_formation_project import task_metrics
+
+
+class Command(BaseCommand):
+    help = 'Print Celery task queue-wait and run-time histograms and outcome counts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=['json', 'prometheus'], default='json')
+
+    def handle(self, *args, **options):
+        stats = task_metrics.collect()
+        if options['format'] == 'prometheus':
+            self.stdout.write(task_metrics.render_prometheus(stats), ending='')
+        else:
+            self.stdout.write(json.dumps(stats, indent=2, sort_keys=True))
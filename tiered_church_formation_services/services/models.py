@@ -1,9 +1,67 @@
 ## services/models.py
 
-from django.db import models
+from django.db import connection, models, transaction
 from django.conf import settings
 from django.core.validators import MinValueValidator
 from django.utils import timezone
+import json
+
+# Lock the batch's existing steps in name order, so concurrent batches never
+# deadlock. Run as its own statement: the upsert below then starts from a
+# snapshot that already holds every status committed while the locks were
+# awaited, and its old statuses and the project's counters agree.
+LOCK_PROGRESS_STEPS_SQL = """
+    SELECT step.id
+        FROM {step} AS step
+        WHERE step.project_id = %(project)s AND step.name IN (SELECT jsonb_object_keys(%(steps)s::jsonb))
+        ORDER BY step.name
+        FOR UPDATE
+"""
+
+# Upsert a batch of step statuses and fold the changes into the project's
+# progress and counters.
+UPDATE_PROGRESS_STEPS_SQL = """
+    WITH input AS (
+        SELECT key AS name, value AS status FROM jsonb_each_text(%(steps)s::jsonb)
+    ),
+    locked AS (
+        SELECT step.id, step.name, step.status AS old_status
+            FROM {step} AS step
+            JOIN input ON input.name = step.name
+            WHERE step.project_id = %(project)s
+            ORDER BY step.name
+            FOR UPDATE OF step
+    ),
+    changed AS (
+        UPDATE {step} AS step SET status = input.status, updated_at = %(now)s
+            FROM locked JOIN input ON input.name = locked.name
+            WHERE step.id = locked.id AND step.status <> input.status
+            RETURNING step.name, step.status, locked.old_status
+    ),
+    inserted AS (
+        INSERT INTO {step} (project_id, name, status, updated_at)
+            SELECT %(project)s, input.name, input.status, %(now)s
+                FROM input
+                WHERE input.name NOT IN (SELECT name FROM locked)
+            ON CONFLICT (project_id, name) DO NOTHING
+            RETURNING name, status
+    ),
+    applied AS (
+        SELECT input.name, input.status
+            FROM input
+            WHERE input.name IN (SELECT name FROM locked) OR input.name IN (SELECT name FROM inserted)
+    )
+    UPDATE {project} SET
+        progress = progress || COALESCE((SELECT jsonb_object_agg(name, status) FROM applied), '{{}}'::jsonb),
+        total_steps = total_steps + (SELECT COUNT(*) FROM inserted),
+        completed_steps = completed_steps
+            + (SELECT COUNT(*) FROM inserted WHERE status = 'completed')
+            + (SELECT COUNT(*) FROM changed WHERE status = 'completed')
+            - (SELECT COUNT(*) FROM changed WHERE old_status = 'completed')
+        WHERE id = %(project)s
+        RETURNING progress, total_steps, completed_steps,
+            (SELECT array_agg(input.name) FROM input WHERE input.name NOT IN (SELECT name FROM applied))
+"""
 
 class ServiceTier(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -29,24 +87,118 @@ class ClientProject(models.Model):
     start_date = models.DateTimeField(default=timezone.now)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     progress = models.JSONField(default=dict)
+    total_steps = models.PositiveIntegerField(default=0)
+    completed_steps = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['client', 'status']),
+            models.Index(fields=['status']),
+        ]
+
+    # Status as loaded from the database; stays None for new and status-deferred instances
+    _original_status = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Guarded so a deferred status (only()/defer()) isn't fetched for every loaded row
+        if 'status' in instance.__dict__:
+            instance._original_status = instance.status
+        return instance
 
     def __str__(self):
         return f"{self.project_name} - {self.client.email}"
 
+    def save(self, *args, **kwargs):
+        # A status that was deferred and never assigned can't have changed
+        status_changed = self._state.adding or (
+            'status' in self.__dict__ and self.status != self._original_status
+        )
+        super().save(*args, **kwargs)
+        if status_changed:
+            # Cleared only once the new status is visible to other connections,
+            # otherwise a concurrent read could re-cache the old answer.
+            transaction.on_commit(self._invalidate_entitlements)
+            self._original_status = self.status
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        transaction.on_commit(self._invalidate_entitlements)
+        return result
+
+    def _invalidate_entitlements(self):
+        from .entitlements import invalidate_premium_access
+        invalidate_premium_access(self.client_id)
+
     def start_project(self):
         if self.status == 'pending':
             self.status = 'in_progress'
             self.start_date = timezone.now()
-            self.save()
+            self.save(update_fields=['status', 'start_date'])
 
     def update_progress(self, step: str, status: str):
-        self.progress[step] = status
-        self.save()
+        self.update_progress_steps({step: status})
+
+    def update_progress_steps(self, steps: dict):
+        """
+        Record step statuses in the progress column, the ProjectStep table and
+        the step counters.
+
+        Each pass is a short transaction: existing steps are locked first, then
+        one statement updates them, inserts the missing ones and adjusts
+        progress plus both counters by the exact difference, without locking
+        the project row up front. Locking in a separate statement matters:
+        a single statement reads from the snapshot it started with, so a
+        status committed while it waited on a step lock would be missed, and
+        the counters computed from the stale project row can fail their CHECK
+        constraint before PostgreSQL rechecks the updated row. Steps whose
+        insert lost a race with a concurrent writer are skipped by ON CONFLICT
+        DO NOTHING and go through another pass, where they are updated like
+        any other existing step. Outside an enclosing transaction every pass
+        commits on its own, so a retry never waits on step locks while
+        holding the project row.
+        """
+        pending = dict(steps)
+        tables = {'project': ClientProject._meta.db_table, 'step': ProjectStep._meta.db_table}
+        lock_sql = LOCK_PROGRESS_STEPS_SQL.format(**tables)
+        sql = UPDATE_PROGRESS_STEPS_SQL.format(**tables)
+        with connection.cursor() as cursor:
+            while pending:
+                params = {'project': self.pk, 'steps': json.dumps(pending), 'now': timezone.now()}
+                with transaction.atomic():
+                    cursor.execute(lock_sql, params)
+                    cursor.execute(sql, params)
+                    row = cursor.fetchone()
+                if row is None:
+                    raise ClientProject.DoesNotExist(f"ClientProject {self.pk} no longer exists.")
+                progress, self.total_steps, self.completed_steps, skipped = row
+                self.progress = json.loads(progress)  # Django reads jsonb back as text on raw cursors
+                pending = {name: pending[name] for name in skipped or []}
+
+    @property
+    def all_steps_completed(self) -> bool:
+        return self.total_steps > 0 and self.completed_steps == self.total_steps
 
     def complete_project(self):
         if self.status == 'in_progress':
             self.status = 'completed'
-            self.save()
+            self.save(update_fields=['status'])
+
+class ProjectStep(models.Model):
+    project = models.ForeignKey(ClientProject, on_delete=models.CASCADE, related_name='steps')
+    name = models.CharField(max_length=255)
+    status = models.CharField(max_length=50)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['project', 'name']
+        indexes = [
+            models.Index(fields=['name', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.project.project_name} - {self.name}: {self.status}"
 
 class Payment(models.Model):
     PAYMENT_STATUS_CHOICES = [
@@ -65,6 +217,11 @@ class Payment(models.Model):
     def __str__(self):
         return f"Payment of ${self.amount} by {self.user.email}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-timestamp']),
+        ]
+
     def process_payment(self):
         # This method would integrate with Stripe to process the payment
         # For now, we'll just mark it as completed
@@ -20,8 +20,8 @@ class ClientProjectSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ClientProject
-        fields = ['id', 'client', 'service_tier', 'service_tier_id', 'project_name', 'start_date', 'status', 'progress']
-        read_only_fields = ['id', 'client', 'start_date', 'status', 'progress']
+        fields = ['id', 'client', 'service_tier', 'service_tier_id', 'project_name', 'start_date', 'status', 'progress', 'total_steps', 'completed_steps']
+        read_only_fields = ['id', 'client', 'start_date', 'status', 'progress', 'total_steps', 'completed_steps']
 
     def create(self, validated_data):
         user = self.context['request'].user
@@ -30,7 +30,8 @@ class ClientProjectSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        # Only the edited columns, so a stale instance never writes back progress or step counters
+        instance.save(update_fields=list(validated_data))
         return instance
 
 class PaymentSerializer(serializers.ModelSerializer):
@@ -49,6 +50,9 @@ class ProjectProgressUpdateSerializer(serializers.Serializer):
     step = serializers.CharField(required=True)
     status = serializers.CharField(required=True)
 
+class ProjectProgressBatchUpdateSerializer(serializers.Serializer):
+    steps = ProjectProgressUpdateSerializer(many=True, allow_empty=False)
+
 class PaymentProcessSerializer(serializers.Serializer):
     stripe_token = serializers.CharField(required=True)
 
@@ -2,16 +2,63 @@
 
 from celery import shared_task
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.cache import cache
+from django.core.mail import EmailMessage, send_mail, send_mass_mail
 from django.utils import timezone
-from django.db import models
+from django.utils.dateparse import parse_date
+from django.db import models, transaction
 from .models import ClientProject, Payment
+from .entitlements import invalidate_premium_access, invalidate_premium_access_many
+from datetime import datetime, time
+from itertools import islice
+import csv
+import gzip
+import io
+import tempfile
+from time import sleep
 import stripe
 import logging
 
 logger = logging.getLogger(__name__)
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
+def chunked(iterable, size: int):
+    """
+    Yield lists of at most ``size`` items from ``iterable`` without materializing it.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def queue_email_batches(messages) -> int:
+    """
+    Split (subject, message, from_email, recipient_list) tuples into chunks and
+    hand each chunk to send_email_batch. Returns the number of chunks queued.
+    """
+    batches = 0
+    for chunk in chunked(messages, settings.EMAIL_BATCH_SIZE):
+        send_email_batch.delay(chunk)
+        batches += 1
+    return batches
+
+@shared_task
+def send_email_batch(messages: list) -> int:
+    """
+    Send a chunk of emails over a single mail connection.
+    """
+    return send_mass_mail([tuple(message) for message in messages], fail_silently=False)
+
+@shared_task
+def benchmark_probe(work_seconds: float = 0) -> None:
+    """
+    Stand-in task for benchmark_task_queues that optionally sleeps to simulate work.
+    """
+    if work_seconds:
+        sleep(work_seconds)
+
 @shared_task
 def process_payment_task(project_id: int) -> None:
     """
@@ -58,21 +105,46 @@ def process_payment_task(project_id: int) -> None:
         # Handle the error (e.g., mark payment as failed, notify the user)
     except Exception as e:
         logger.error(f"Unexpected error in process_payment_task: {str(e)}")
+        # Re-raise so the failure is recorded by the task metrics instead of passing as success
+        raise
+
+PROJECT_STATUS_PENDING_KEY = 'project_status_pending_{project_id}'
+
+def schedule_project_status_evaluation(project_id: int) -> bool:
+    """
+    Queue a status evaluation for the project unless one is already pending.
+
+    Progress posts arriving within PROJECT_STATUS_DEBOUNCE_SECONDS collapse
+    into a single delayed update_project_status_task, which reads the latest
+    state when it runs. Returns whether a new task was queued.
+    """
+    debounce = settings.PROJECT_STATUS_DEBOUNCE_SECONDS
+    # The key outlives the countdown so a lost task only delays, never blocks, re-evaluation.
+    if not cache.add(PROJECT_STATUS_PENDING_KEY.format(project_id=project_id), True, timeout=debounce * 5):
+        return False
+    update_project_status_task.apply_async((project_id,), countdown=debounce)
+    return True
 
 @shared_task
 def update_project_status_task(project_id: int) -> None:
     """
     Update the status of a client project based on its progress.
     """
+    # Clear the pending marker first so progress posted from here on schedules a fresh run.
+    cache.delete(PROJECT_STATUS_PENDING_KEY.format(project_id=project_id))
     try:
         project = ClientProject.objects.select_related('client').get(id=project_id)
-        total_steps = len(project.progress)
-        completed_steps = sum(1 for status in project.progress.values() if status == 'completed')
 
-        if total_steps > 0:
-            if completed_steps == total_steps:
-                project.complete_project()
-                
+        if project.total_steps > 0:
+            # The conditional UPDATE is the idempotency marker shared with the
+            # update_project_statuses sweep: only the caller that actually moves
+            # the project out of 'in_progress' sends the email.
+            if project.all_steps_completed and ClientProject.objects.filter(
+                pk=project.pk, status='in_progress'
+            ).update(status='completed') == 1:
+                # The update bypasses ClientProject.save, so drop the cached entitlement here
+                invalidate_premium_access(project.client_id)
+
                 # Send project completion email
                 send_mail(
                     subject="Project Completed",
@@ -88,6 +160,52 @@ def update_project_status_task(project_id: int) -> None:
         logger.error(f"ClientProject with id {project_id} does not exist.")
     except Exception as e:
         logger.error(f"Unexpected error in update_project_status_task: {str(e)}")
+        # Re-raise so the failure is recorded by the task metrics instead of passing as success
+        raise
+
+@shared_task
+def update_project_statuses() -> None:
+    """
+    Complete every in-progress project whose steps are all completed.
+
+    Completion is read from the stored step counters and projects are moved
+    to 'completed' in batched UPDATEs. The status change is the idempotency
+    marker: a project is only selected while still in progress, and rows are
+    claimed with SKIP LOCKED, so overlapping runs never notify twice.
+    """
+    batch_size = settings.CELERY_BULK_TASK_BATCH_SIZE
+    finished_projects = ClientProject.objects.filter(
+        status='in_progress',
+        total_steps__gt=0,
+        completed_steps=models.F('total_steps')
+    ).order_by('pk')
+
+    completed = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                finished_projects.select_for_update(skip_locked=True, of=('self',))
+                .values_list('pk', 'client_id', 'project_name', 'client__email')[:batch_size]
+            )
+            if not batch:
+                break
+            ClientProject.objects.filter(pk__in=[pk for pk, _, _, _ in batch], status='in_progress').update(status='completed')
+
+        # Bulk updates bypass ClientProject.save, so drop the cached entitlements here
+        invalidate_premium_access_many(client_id for _, client_id, _, _ in batch)
+
+        queue_email_batches(
+            (
+                "Project Completed",
+                f"Your project '{project_name}' has been completed successfully.",
+                settings.DEFAULT_FROM_EMAIL,
+                [email],
+            )
+            for _, _, project_name, email in batch
+        )
+        completed += len(batch)
+
+    logger.info(f"Marked {completed} projects as completed.")
 
 @shared_task
 def send_project_reminders() -> None:
@@ -100,80 +218,163 @@ def send_project_reminders() -> None:
     projects_to_remind = ClientProject.objects.filter(
         status='in_progress',
         start_date__lte=threshold_date
-    ).select_related('client')
+    ).values_list('project_name', 'client__email').iterator(chunk_size=settings.EMAIL_BATCH_SIZE)
 
-    for project in projects_to_remind:
-        send_mail(
-            subject="Project Update Reminder",
-            message=f"This is a friendly reminder to update your project '{project.project_name}'. It's been {threshold_days} days since your last update.",
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[project.client.email],
-            fail_silently=False,
+    messages = (
+        (
+            "Project Update Reminder",
+            f"This is a friendly reminder to update your project '{project_name}'. It's been {threshold_days} days since your last update.",
+            settings.DEFAULT_FROM_EMAIL,
+            [email],
         )
+        for project_name, email in projects_to_remind
+    )
+    batches = queue_email_batches(messages)
+    logger.info(f"Queued {batches} project reminder batches.")
 
 @shared_task
 def clean_pending_payments() -> None:
     """
     Clean up pending payments that are older than a certain threshold.
+
+    Works in batches of PAYMENT_CLEANUP_BATCH_SIZE: each batch cancels the
+    affected users' pending projects in one UPDATE and removes the payments in
+    one DELETE, so a large backlog never holds locks for long.
     """
     threshold_hours = 24  # Number of hours after which pending payments should be cleaned up
     threshold_date = timezone.now() - timezone.timedelta(hours=threshold_hours)
+    batch_size = settings.PAYMENT_CLEANUP_BATCH_SIZE
 
-    pending_payments = Payment.objects.filter(
+    stale_payments = Payment.objects.filter(
         status='pending',
         timestamp__lte=threshold_date
-    ).select_related('user')
+    ).order_by('pk')
 
-    for payment in pending_payments:
-        # Cancel the associated project
-        ClientProject.objects.filter(client=payment.user, status='pending').update(status='cancelled')
+    cleaned = 0
+    while True:
+        with transaction.atomic():
+            # Skip rows another cleanup run is already holding.
+            batch = list(
+                stale_payments.select_for_update(skip_locked=True, of=('self',))
+                .values_list('pk', 'user_id', 'user__email', 'amount')[:batch_size]
+            )
+            if not batch:
+                break
 
-        # Delete the pending payment
-        payment.delete()
+            # Cancel the associated projects
+            ClientProject.objects.filter(
+                client_id__in={user_id for _, user_id, _, _ in batch},
+                status='pending'
+            ).update(status='cancelled')
 
-        # Notify the user
-        send_mail(
-            subject="Payment Cancelled",
-            message=f"Your pending payment of ${payment.amount} has been cancelled due to inactivity.",
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[payment.user.email],
-            fail_silently=False,
+            # Delete the pending payments
+            Payment.objects.filter(pk__in=[pk for pk, _, _, _ in batch]).delete()
+
+        # Notify the users once the batch is committed
+        queue_email_batches(
+            (
+                "Payment Cancelled",
+                f"Your pending payment of ${amount} has been cancelled due to inactivity.",
+                settings.DEFAULT_FROM_EMAIL,
+                [email],
+            )
+            for _, _, email, amount in batch
         )
+        cleaned += len(batch)
+
+    logger.info(f"Cleaned up {cleaned} stale pending payments.")
+
+def parse_report_date(value: str, argument: str):
+    """
+    Parse an ISO date passed to generate_monthly_report, rejecting bad input up front.
+    """
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None  # Well formed but impossible, e.g. 2024-02-30
+    if parsed is None:
+        raise ValueError(f"{argument} must be an ISO date (YYYY-MM-DD), got {value!r}.")
+    return parsed
 
 @shared_task
-def generate_monthly_report() -> None:
+def generate_monthly_report(start_date: str = None, end_date: str = None) -> None:
     """
-    Generate a monthly report of completed projects and revenue.
+    Generate a report of completed projects and revenue.
+
+    Covers the previous calendar month by default. Pass ISO dates (end date
+    exclusive) to backfill an arbitrary period. Totals come from database
+    aggregates and the project listing is streamed into a gzipped CSV in a
+    temporary file, which is attached to the email, so only the compressed
+    listing is ever held in memory.
     """
-    last_month = timezone.now().replace(day=1) - timezone.timedelta(days=1)
-    start_date = last_month.replace(day=1)
-    end_date = timezone.now().replace(day=1)
+    if bool(start_date) != bool(end_date):
+        raise ValueError("Both start_date and end_date are required for a custom report period.")
+
+    if start_date:
+        first_day = parse_report_date(start_date, 'start_date')
+        last_day = parse_report_date(end_date, 'end_date')
+        if last_day <= first_day:
+            raise ValueError("end_date must be after start_date.")
+        period_start = timezone.make_aware(datetime.combine(first_day, time.min))
+        period_end = timezone.make_aware(datetime.combine(last_day, time.min))
+        period_label = f"{period_start:%Y-%m-%d} to {period_end - timezone.timedelta(days=1):%Y-%m-%d}"
+    else:
+        period_end = timezone.localtime().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        period_start = (period_end - timezone.timedelta(days=1)).replace(day=1)
+        period_label = period_start.strftime('%B %Y')
 
     completed_projects = ClientProject.objects.filter(
         status='completed',
-        start_date__gte=start_date,
-        start_date__lt=end_date
-    ).select_related('client')
+        start_date__gte=period_start,
+        start_date__lt=period_end
+    )
+
+    tier_breakdown = list(
+        completed_projects.values('service_tier__name')
+        .annotate(project_count=models.Count('id'), billed=models.Sum('service_tier__price'))
+        .order_by('service_tier__name')
+    )
 
     total_revenue = Payment.objects.filter(
         status='completed',
-        timestamp__gte=start_date,
-        timestamp__lt=end_date
+        timestamp__gte=period_start,
+        timestamp__lt=period_end
     ).aggregate(total=models.Sum('amount'))['total'] or 0
 
-    report = f"Monthly Report ({start_date.strftime('%B %Y')})\n\n"
-    report += f"Completed Projects: {completed_projects.count()}\n"
-    report += f"Total Revenue: ${total_revenue}\n\n"
-    report += "Project Details:\n"
+    report_lines = [
+        f"Report ({period_label})",
+        "",
+        f"Completed Projects: {sum(row['project_count'] for row in tier_breakdown)}",
+        f"Total Revenue: ${total_revenue}",
+        "",
+        "Completed Projects by Service Tier:",
+    ]
+    report_lines.extend(
+        f"- {row['service_tier__name']}: {row['project_count']} projects, ${row['billed']} billed"
+        for row in tier_breakdown
+    )
 
-    for project in completed_projects:
-        report += f"- {project.project_name} (Client: {project.client.email})\n"
+    with tempfile.TemporaryFile() as report_file:
+        with gzip.GzipFile(fileobj=report_file, mode='wb') as gzip_file, \
+                io.TextIOWrapper(gzip_file, encoding='utf-8', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(['project_id', 'project_name', 'client_email', 'service_tier', 'start_date'])
+            projects = completed_projects.order_by('start_date', 'pk').values_list(
+                'id', 'project_name', 'client__email', 'service_tier__name', 'start_date'
+            ).iterator(chunk_size=2000)
+            for project_id, project_name, client_email, tier_name, project_start in projects:
+                writer.writerow([project_id, project_name, client_email, tier_name, project_start.isoformat()])
 
+        report_file.seek(0)
+        # Client emails never leave the worker except inside this message, so nothing sits in public media
+        message = EmailMessage(
+            subject=f"Monthly Report - {period_label}",
+            body="\n".join(report_lines + ["", "Project details are attached as a gzipped CSV."]),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[admin[1] for admin in settings.ADMINS],
+        )
+        message.attach(
+            f"report_{period_start:%Y_%m_%d}_{period_end:%Y_%m_%d}.csv.gz", report_file.read(), 'application/gzip'
+        )
     # Send report to administrators
-    send_mail(
-        subject=f"Monthly Report - {start_date.strftime('%B %Y')}",
-        message=report,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[admin[1] for admin in settings.ADMINS],
-        fail_silently=False,
-    )
+    message.send(fail_silently=False)
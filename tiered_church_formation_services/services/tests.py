@@ -0,0 +1,199 @@
+## services/tests.py
+
+import csv
+import gzip
+import io
+import threading
+import time
+import pytest
+from django.core import mail
+from django.db import connection, transaction
+from rest_framework.test import force_authenticate
+from .models import ClientProject, ProjectStep, ServiceTier
+from .tasks import generate_monthly_report, update_project_status_task, update_project_statuses
+from . import views
+from .views import BatchUpdateProjectProgressView, UpdateProjectProgressView
+
+
+@pytest.fixture
+def tier(db):
+    return ServiceTier.objects.create(name='Standard', description='Standard tier.', price=1499)
+
+
+@pytest.mark.parametrize('start_date, end_date', [
+    ('2024-01-01', None),
+    ('last month', '2024-02-01'),
+    ('2024-02-30', '2024-03-01'),
+    ('2024-02-01', '2024-01-01'),
+])
+def test_monthly_report_rejects_invalid_periods(start_date, end_date):
+    with pytest.raises(ValueError):
+        generate_monthly_report(start_date, end_date)
+
+
+@pytest.mark.django_db
+def test_monthly_report_attaches_a_gzipped_csv(settings, tier, make_user):
+    settings.ADMINS = [('Admin', 'admin@example.com')]
+    client = make_user()
+    for name in ['Grace Chapel', 'Hope Fellowship']:
+        ClientProject.objects.create(
+            client=client, service_tier=tier, project_name=name, status='completed', start_date='2024-01-15T10:00:00Z',
+        )
+
+    generate_monthly_report('2024-01-01', '2024-02-01')
+
+    [message] = mail.outbox
+    assert message.to == ['admin@example.com']
+    assert 'Completed Projects: 2' in message.body
+    [(filename, content, mimetype)] = message.attachments
+    assert (filename, mimetype) == ('report_2024_01_01_2024_02_01.csv.gz', 'application/gzip')
+    rows = list(csv.reader(io.StringIO(gzip.decompress(content).decode('utf-8'))))
+    assert [row[1] for row in rows[1:]] == ['Grace Chapel', 'Hope Fellowship']
+    assert {row[2] for row in rows[1:]} == {client.email}
+
+
+@pytest.mark.django_db
+def test_loading_projects_without_status_does_not_fetch_it(tier, make_user, django_assert_num_queries):
+    for name in ['Grace Chapel', 'Hope Fellowship']:
+        ClientProject.objects.create(client=make_user(), service_tier=tier, project_name=name, status='in_progress')
+
+    with django_assert_num_queries(1):
+        projects = list(ClientProject.objects.only('id', 'project_name'))
+    with django_assert_num_queries(1):
+        projects[0].project_name = 'Grace Church'
+        projects[0].save(update_fields=['project_name'])
+    assert 'status' not in projects[0].__dict__
+
+@pytest.mark.django_db
+def test_project_completion_email_is_sent_once(tier, make_user):
+    project = ClientProject.objects.create(
+        client=make_user(), service_tier=tier, project_name='Grace Chapel', status='in_progress',
+    )
+    project.update_progress_steps({'intake': 'completed', 'bylaws': 'completed'})
+
+    update_project_status_task(project.pk)
+    update_project_status_task(project.pk)
+    update_project_statuses()
+
+    project.refresh_from_db()
+    assert project.status == 'completed'
+    assert [message.subject for message in mail.outbox] == ['Project Completed']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_progress_posts_keep_exact_counters(api_factory, tier, make_user):
+    client = make_user()
+    project = ClientProject.objects.create(
+        client=client, service_tier=tier, project_name='Grace Chapel', status='in_progress',
+    )
+    workers = 8
+    barrier = threading.Barrier(workers)
+    errors = []
+
+    def post_progress(worker):
+        # Every worker adds its own step and flips a step shared with all the others
+        posts = [{'step': f'step_{worker}', 'status': 'completed'}, {'step': 'shared', 'status': 'completed'}]
+        if worker % 2:
+            posts[1]['status'] = 'pending'
+        try:
+            barrier.wait()
+            for data in posts:
+                request = api_factory.post('/', data, format='json')
+                force_authenticate(request, user=client)
+                response = UpdateProjectProgressView.as_view()(request, pk=project.pk)
+                assert response.status_code == 200, response.data
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=post_progress, args=(worker,)) for worker in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    project.refresh_from_db()
+    steps = dict(ProjectStep.objects.filter(project=project).values_list('name', 'status'))
+    assert len(steps) == workers + 1
+    assert project.total_steps == len(steps)
+    assert project.completed_steps == sum(1 for status in steps.values() if status == 'completed')
+    assert project.progress == steps
+
+
+@pytest.mark.django_db(transaction=True)
+def test_step_update_waiting_on_a_lock_applies_over_the_committed_status(tier, make_user):
+    project = ClientProject.objects.create(
+        client=make_user(), service_tier=tier, project_name='Grace Chapel', status='in_progress',
+    )
+    project.update_progress_steps({'shared': 'pending'})
+    locked = threading.Event()
+
+    def complete_and_hold():
+        try:
+            with transaction.atomic():
+                ClientProject.objects.get(pk=project.pk).update_progress_steps({'shared': 'completed'})
+                locked.set()
+                time.sleep(0.5)  # Long enough for the other statement to take its snapshot and block
+        finally:
+            connection.close()
+
+    holder = threading.Thread(target=complete_and_hold)
+    holder.start()
+    locked.wait()
+    # Its snapshot still has 'pending', the status it is writing, while the committed row says 'completed'
+    project.update_progress_steps({'shared': 'pending'})
+    holder.join()
+
+    project.refresh_from_db()
+    assert ProjectStep.objects.get(project=project, name='shared').status == 'pending'
+    assert project.progress == {'shared': 'pending'}
+    assert project.completed_steps == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_completions_and_status_evaluations_do_not_deadlock(api_factory, tier, make_user):
+    client = make_user()
+    project = ClientProject.objects.create(
+        client=client, service_tier=tier, project_name='Grace Chapel', status='in_progress',
+    )
+    workers = 8
+    barrier = threading.Barrier(workers)
+    errors = []
+
+    def complete_steps(worker):
+        # Overlapping batches insert and flip the same steps, then every worker evaluates the status directly
+        steps = [{'step': f'step_{(worker + offset) % workers}', 'status': 'completed'} for offset in range(3)]
+        try:
+            barrier.wait()
+            request = api_factory.post('/', {'steps': steps}, format='json')
+            force_authenticate(request, user=client)
+            response = BatchUpdateProjectProgressView.as_view()(request, pk=project.pk)
+            assert response.status_code == 200, response.data
+            update_project_status_task(project.pk)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=complete_steps, args=(worker,)) for worker in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    project.refresh_from_db()
+    assert (project.total_steps, project.completed_steps) == (workers, workers)
+    assert project.status == 'completed'
+    assert [message.subject for message in mail.outbox] == ['Project Completed']
+
+
+@pytest.mark.parametrize('view, user, url_kwargs, params', [
+    (views.ServiceTierListView, 'client', {}, {}),
+    (views.ClientProjectListCreateView, 'client', {}, {}),
+    (views.PaymentListView, 'client', {}, {}),
+])
+def test_list_queries_are_constant_in_page_size(view, user, url_kwargs, params, assert_constant_queries):
+    assert_constant_queries(view, user, url_kwargs, params)
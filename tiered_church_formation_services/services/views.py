@@ -5,9 +5,14 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 from .models import ServiceTier, ClientProject, Payment
-from .serializers import ServiceTierSerializer, ClientProjectSerializer, PaymentSerializer
+from .serializers import (
+    ServiceTierSerializer,
+    ClientProjectSerializer,
+    PaymentSerializer,
+    ProjectProgressBatchUpdateSerializer,
+)
 from users.models import User
-from .tasks import process_payment_task, update_project_status_task
+from .tasks import process_payment_task, schedule_project_status_evaluation
 from django.db import transaction
 
 class ServiceTierListView(generics.ListAPIView):
@@ -20,7 +25,17 @@ class ClientProjectListCreateView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return ClientProject.objects.filter(client=self.request.user)
+        queryset = ClientProject.objects.filter(client=self.request.user).select_related('client', 'service_tier')
+
+        # Filter by step state through the indexed ProjectStep table
+        step = self.request.query_params.get('step')
+        step_status = self.request.query_params.get('step_status')
+        if step:
+            step_filter = {'steps__name': step}
+            if step_status:
+                step_filter['steps__status'] = step_status
+            queryset = queryset.filter(**step_filter)
+        return queryset
 
     def perform_create(self, serializer):
         service_tier = get_object_or_404(ServiceTier, id=self.request.data.get('service_tier'))
@@ -57,13 +72,26 @@ class UpdateProjectProgressView(APIView):
     def post(self, request, pk):
         project = get_object_or_404(ClientProject, id=pk, client=request.user)
         step = request.data.get('step')
-        status = request.data.get('status')
-        if step and status:
-            project.update_progress(step, status)
-            update_project_status_task.delay(project.id)
+        step_status = request.data.get('status')
+        if step and step_status:
+            project.update_progress(step, step_status)
+            schedule_project_status_evaluation(project.id)
             return Response({'message': 'Progress updated successfully'}, status=status.HTTP_200_OK)
         return Response({'error': 'Invalid data'}, status=status.HTTP_400_BAD_REQUEST)
 
+class BatchUpdateProjectProgressView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        project = get_object_or_404(ClientProject, id=pk, client=request.user)
+        serializer = ProjectProgressBatchUpdateSerializer(data=request.data)
+        if serializer.is_valid():
+            steps = {item['step']: item['status'] for item in serializer.validated_data['steps']}
+            project.update_progress_steps(steps)
+            schedule_project_status_evaluation(project.id)
+            return Response({'message': 'Progress updated successfully'}, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
 class CompleteProjectView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -79,7 +107,7 @@ class PaymentListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Payment.objects.filter(user=self.request.user)
+        return Payment.objects.filter(user=self.request.user).select_related('user').order_by('-timestamp')
 
 class ProcessPaymentView(APIView):
     permission_classes = [permissions.IsAuthenticated]